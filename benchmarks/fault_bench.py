@@ -0,0 +1,121 @@
+"""
+Measure the resilience layer against a local stand-in that injects faults.
+
+Sends the same flow runs through a plain PooledConsole and one with a
+Resilience policy while the stub answers some requests with 503, drops some
+connections and delays a slow tail. Reports success rate, latency percentiles
+and upstream attempts per call, then shows the circuit breaker failing fast
+against a backend that is fully down.
+
+    python benchmarks/fault_bench.py --requests 400 --error-rate 0.1 --slow-rate 0.05
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stub_server import StubServer, percentile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moodify.exceptions import CircuitOpenError, MiraRequestError
+from moodify.resilience import CircuitBreaker, HedgePolicy, Resilience, RetryPolicy
+from moodify.transport import PoolConfig, PooledConsole
+
+FLOW_CONFIG = {"version": "1.0.0", "prompt": "x" * 1_000}
+INPUT = {"input": {"mood": "Happy"}}
+
+
+def bench(console, requests, concurrency):
+    def one(_):
+        started = time.perf_counter()
+        try:
+            console.run_flow(FLOW_CONFIG, INPUT, None)
+            ok = True
+        except MiraRequestError:
+            ok = False
+        return ok, time.perf_counter() - started
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return list(executor.map(one, range(requests)))
+
+
+def report(name, stub, results):
+    latencies = [seconds for _, seconds in results]
+    succeeded = sum(ok for ok, _ in results)
+    print(
+        f"{name:<10} {100 * succeeded / len(results):6.1f}% ok  "
+        f"p50 {percentile(latencies, 50) * 1000:7.1f} ms  p99 {percentile(latencies, 99) * 1000:7.1f} ms  "
+        f"{stub.requests / len(results):4.2f} attempts/call"
+    )
+    stub.requests = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="normal stub latency in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.1)
+    parser.add_argument("--drop-rate", type=float, default=0.02)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=1.0)
+    args = parser.parse_args()
+
+    stub = StubServer(
+        latency=args.latency,
+        error_rate=args.error_rate,
+        drop_rate=args.drop_rate,
+        slow_rate=args.slow_rate,
+        slow_latency=args.slow_latency,
+    ).start()
+    pool_config = PoolConfig(per_host_limit=args.concurrency * 2)
+
+    def console(resilience=None):
+        instance = PooledConsole("bench", pool_config, resilience)
+        instance.base_url = stub.url
+        return instance
+
+    plain = console()
+    report("plain", stub, bench(plain, args.requests, args.concurrency))
+    plain.close()
+
+    resilient = console(Resilience(
+        default_timeout=10.0,
+        retry=RetryPolicy(max_attempts=3, base_delay=0.01),
+        hedge=HedgePolicy(percentile=90, min_samples=20),
+        breaker=CircuitBreaker(failure_threshold=50),
+    ))
+    # Warm the latency history so hedging is active for the measured run
+    bench(resilient, 50, args.concurrency)
+    stub.requests = 0
+    report("resilient", stub, bench(resilient, args.requests, args.concurrency))
+    resilient.close()
+
+    # Backend fully down: the breaker opens and later calls never reach it
+    stub.error_rate, stub.drop_rate, stub.slow_rate = 1.0, 0.0, 0.0
+    down = console(Resilience(
+        retry=RetryPolicy(max_attempts=2, base_delay=0.01),
+        breaker=CircuitBreaker(failure_threshold=5, reset_timeout=60.0),
+    ))
+    started = time.perf_counter()
+    fail_fast = 0
+    for _ in range(args.requests):
+        try:
+            down.run_flow(FLOW_CONFIG, INPUT, None)
+        except CircuitOpenError:
+            fail_fast += 1
+        except MiraRequestError:
+            pass
+    elapsed = time.perf_counter() - started
+    print(
+        f"{'down':<10} {fail_fast}/{args.requests} failed fast  "
+        f"{stub.requests} upstream requests  {elapsed / args.requests * 1000:.2f} ms/call"
+    )
+    down.close()
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
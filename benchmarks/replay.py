@@ -0,0 +1,113 @@
+"""
+Replay recorded playlist requests at a target rate against a local stub.
+
+Reads a JSON-lines log in which each record carries an "input" dict, such as
+the traces written when MOODIFY_TRACE_FILE is set, and drives the inputs
+open-loop at --rate requests per second through a pool of workers running
+moodify-test-local.py. Reports throughput, p50/p95/p99 latency and a per-phase
+breakdown taken from the workers' own instrumentation.
+
+    MOODIFY_TRACE_FILE=traces.jsonl npm run dev   # record
+    python benchmarks/replay.py traces.jsonl --rate 20 --duration 30
+"""
+import argparse
+import itertools
+import json
+import os
+import statistics
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from stub_server import StubServer, percentile
+from worker_pool_bench import Worker
+
+
+def load_inputs(path):
+    inputs = []
+    with open(path) as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if isinstance(record.get("input"), dict):
+                inputs.append(record["input"])
+    if not inputs:
+        raise SystemExit(f"No records with an \"input\" object in {path}")
+    return inputs
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("log", help="JSON-lines file of recorded requests")
+    parser.add_argument("--rate", type=float, default=10.0, help="requests per second")
+    parser.add_argument("--duration", type=float, help="seconds to run, looping the log (default: one pass)")
+    parser.add_argument("--pool-size", type=int, default=2)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub backend latency in seconds")
+    parser.add_argument("--cache", action="store_true", help="keep the response cache on (off by default)")
+    parser.add_argument("--metrics", action="store_true", help="print a worker's OpenMetrics output at the end")
+    args = parser.parse_args()
+
+    inputs = load_inputs(args.log)
+    total = int(args.duration * args.rate) if args.duration else len(inputs)
+
+    stub = StubServer(latency=args.latency).start()
+    env = dict(os.environ, API_KEY="replay", MIRA_BASE_URL=stub.url, MOODIFY_WORKER_CONCURRENCY="64")
+    if not args.cache:
+        env["MOODIFY_CACHE_TTL"] = "0"
+    workers = [Worker(env) for _ in range(args.pool_size)]
+
+    latencies = []
+    phases = defaultdict(list)
+    errors = 0
+    lock = threading.Lock()
+    ids = itertools.count()
+
+    def one(index, input_data):
+        nonlocal errors
+        request_id = str(next(ids))
+        started = time.perf_counter()
+        reply = workers[index % len(workers)].send(
+            {"id": request_id, "input": input_data, "trace": True}
+        )
+        elapsed = time.perf_counter() - started
+        with lock:
+            latencies.append(elapsed)
+            errors += "error" in reply
+            for name, seconds in reply.get("phases", {}).items():
+                phases[name].append(seconds)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=256) as executor:
+        for index, input_data in zip(range(total), itertools.cycle(inputs)):
+            # Open loop: requests go out on schedule whether or not earlier ones finished
+            delay = started + index / args.rate - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            executor.submit(one, index, input_data)
+    elapsed = time.perf_counter() - started
+
+    if args.metrics:
+        print(workers[0].send({"id": "metrics", "type": "metrics"})["metrics"])
+    for worker in workers:
+        worker.close()
+    stub.stop()
+
+    print(f"requests   {len(latencies)} ({errors} errors) in {elapsed:.1f} s, {len(latencies) / elapsed:.1f} req/s")
+    print(
+        f"latency    p50 {percentile(latencies, 50) * 1000:.1f} ms  "
+        f"p95 {percentile(latencies, 95) * 1000:.1f} ms  "
+        f"p99 {percentile(latencies, 99) * 1000:.1f} ms"
+    )
+    print(f"\n{'phase':<12} {'mean ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, samples in sorted(phases.items()):
+        print(
+            f"{name:<12} {statistics.mean(samples) * 1000:9.2f} "
+            f"{percentile(samples, 95) * 1000:9.2f} {percentile(samples, 99) * 1000:9.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Track start-up cost of moodify-test-local.py: imports, flow load and time to first request.
+
+Import time comes from ``python -X importtime``. End-to-end timings spawn the
+script in worker mode against a local stub and measure until it is ready and
+until the first reply, with an empty and with a populated flow snapshot
+directory. Save a run with --save and compare later runs with --baseline to
+catch regressions.
+
+    python benchmarks/startup_bench.py --save startup.json
+    python benchmarks/startup_bench.py --baseline startup.json --tolerance 0.2
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from stub_server import StubServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "moodify-test-local.py")
+FLOW_PATH = os.path.join(ROOT, "flow.yaml")
+sys.path.insert(0, ROOT)
+
+IMPORT_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|( +)(\S+)")
+
+
+def import_times(env):
+    """Return (total import seconds, top cumulative imports) for one worker start."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", SCRIPT, "--worker"],
+        env=env, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+        stderr=subprocess.PIPE, text=True, check=True,
+    )
+    entries = []
+    for line in result.stderr.splitlines():
+        match = IMPORT_LINE.match(line)
+        if match:
+            entries.append((len(match.group(3)), int(match.group(2)), match.group(4)))
+    top_level = min(depth for depth, _, _ in entries)
+    roots = [(cumulative, name) for depth, cumulative, name in entries if depth == top_level]
+    total = sum(cumulative for cumulative, _ in roots) / 1e6
+    return total, sorted(roots, reverse=True)[:8]
+
+
+def first_request(env):
+    """Spawn a worker and return (seconds until ready, seconds until first reply)."""
+    started = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, SCRIPT, "--worker"], env=env, text=True,
+        stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+    )
+    process.stdout.readline()
+    ready = time.perf_counter() - started
+    process.stdin.write(json.dumps({"id": "1", "input": {"mood": "Happy"}}) + "\n")
+    process.stdin.flush()
+    process.stdout.readline()
+    replied = time.perf_counter() - started
+    process.stdin.close()
+    process.wait()
+    return ready, replied
+
+
+def flow_load_times(snapshot_dir, runs=20):
+    from mira_sdk import Flow
+    from moodify.snapshot import load_flow
+
+    def timed(fn):
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            fn()
+            samples.append(time.perf_counter() - started)
+        return statistics.median(samples)
+
+    load_flow(FLOW_PATH, snapshot_dir)
+    return {
+        "flow_load_sdk": timed(lambda: Flow(source=FLOW_PATH)),
+        "flow_load_snapshot": timed(lambda: load_flow(FLOW_PATH, snapshot_dir)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--save", help="write the metrics to this JSON file")
+    parser.add_argument("--baseline", help="compare against metrics saved with --save")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed relative slowdown")
+    args = parser.parse_args()
+
+    stub = StubServer().start()
+    snapshot_dir = tempfile.mkdtemp(prefix="moodify-snapshots-")
+    env = dict(os.environ, API_KEY="bench", MIRA_BASE_URL=stub.url,
+               MOODIFY_CACHE_TTL="0", MOODIFY_FLOW_SNAPSHOT_DIR=snapshot_dir)
+
+    cold_ready, cold_reply = first_request(env)
+    imports, warm_ready, warm_reply = [], [], []
+    for _ in range(args.runs):
+        total, top = import_times(env)
+        imports.append(total)
+        ready, replied = first_request(env)
+        warm_ready.append(ready)
+        warm_reply.append(replied)
+    stub.stop()
+
+    metrics = {
+        "import_total": statistics.median(imports),
+        "ready_no_snapshot": cold_ready,
+        "first_reply_no_snapshot": cold_reply,
+        "ready": statistics.median(warm_ready),
+        "first_reply": statistics.median(warm_reply),
+    }
+    metrics.update(flow_load_times(snapshot_dir))
+
+    for name, seconds in metrics.items():
+        print(f"{name:<26} {seconds * 1000:9.1f} ms")
+    print("\nslowest top-level imports:")
+    for cumulative, name in top:
+        print(f"  {cumulative / 1000:9.1f} ms  {name}")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(metrics, f, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = [
+            name for name, seconds in metrics.items()
+            if name in baseline and seconds > baseline[name] * (1 + args.tolerance)
+        ]
+        for name in regressions:
+            print(f"REGRESSION {name}: {baseline[name] * 1000:.1f} ms -> {metrics[name] * 1000:.1f} ms")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
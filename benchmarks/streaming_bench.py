@@ -0,0 +1,63 @@
+"""
+Time to first track versus time to full playlist over a chunked-response stub.
+
+The stub trickles a ``{"result": "..."}`` playlist out in small chunks, as a
+generating model would. The buffered path waits for run_flow to return the
+whole body; the streaming path yields parsed tracks as their lines complete.
+
+    python benchmarks/streaming_bench.py --chunk-delay 0.02
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+from stub_server import StubServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from moodify.async_transport import PooledAsyncMiraClient
+
+FLOW_CONFIG = {"version": "1.0.0", "prompt": "{mood}"}
+# Duplicates check that the stream honours the flow's unique constraint
+PLAYLIST = "\n".join(
+    f"{i + 1}. Song {i % 24}, Album {i % 24}, Artist {i % 24}" for i in range(28)
+)
+
+
+async def measure(stub, chunk_delay):
+    async with PooledAsyncMiraClient(config={"API_KEY": "bench"}) as client:
+        client.console.base_url = stub.url
+
+        started = time.perf_counter()
+        await client.flow.run(FLOW_CONFIG, {"mood": "Happy"})
+        buffered = time.perf_counter() - started
+
+        started = time.perf_counter()
+        first = None
+        count = 0
+        async for _ in client.flow.stream(FLOW_CONFIG, {"mood": "Happy"}):
+            count += 1
+            if first is None:
+                first = time.perf_counter() - started
+        streamed = time.perf_counter() - started
+
+    print(f"chunk delay {chunk_delay * 1000:.0f} ms")
+    print(f"  buffered run_flow    {buffered * 1000:8.1f} ms")
+    print(f"  stream first track   {first * 1000:8.1f} ms")
+    print(f"  stream all {count:2d} tracks {streamed * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--chunk-delay", type=float, default=0.02)
+    args = parser.parse_args()
+
+    stub = StubServer(body={"result": PLAYLIST}, chunk_delay=args.chunk_delay).start()
+    asyncio.run(measure(stub, args.chunk_delay))
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
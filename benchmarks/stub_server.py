@@ -0,0 +1,155 @@
+"""Local stand-in for the Mira flow API used by the benchmarks."""
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PLAYLIST = "\n".join(f"Song {i}, Album {i}, Artist {i}" for i in range(25))
+
+
+class StubServer:
+    """
+    Threaded HTTP/1.1 server that answers every request with a canned flow result.
+
+    Args:
+        latency: Seconds to wait before answering each request
+        body: JSON-serialisable reply body; a str is sent as-is as text/plain
+        chunk_delay: When set, send the body with chunked transfer encoding,
+            one chunk per 64 bytes, sleeping this many seconds between chunks
+        error_rate: Fraction of requests answered with 503
+        slow_rate: Fraction of requests delayed by ``slow_latency`` instead of ``latency``
+        slow_latency: Latency of the slow tail, in seconds
+        drop_rate: Fraction of requests whose connection is closed without a reply
+        seed: Seed for the fault injection, so runs are repeatable
+
+    Faults for specific requests can be queued with ``script``: each
+    request takes the next of "error" (503), "bad_error" (503 with a
+    truncated JSON body), "drop", "slow", "garbage" (a 200 with an HTML
+    body) or "ok", and the random rates apply once the script is used up.
+    """
+
+    def __init__(
+            self,
+            latency: float = 0.0,
+            body=None,
+            chunk_delay: float = 0.0,
+            error_rate: float = 0.0,
+            slow_rate: float = 0.0,
+            slow_latency: float = 1.0,
+            drop_rate: float = 0.0,
+            seed: int = 0
+    ):
+        self.latency = latency
+        self.chunk_delay = chunk_delay
+        self.error_rate = error_rate
+        self.slow_rate = slow_rate
+        self.slow_latency = slow_latency
+        self.drop_rate = drop_rate
+        self._random = random.Random(seed)
+        self.script = []
+        if isinstance(body, str):
+            self.content_type = "text/plain; charset=utf-8"
+            self.body = body.encode()
+        else:
+            self.content_type = "application/json"
+            self.body = json.dumps(body if body is not None else {"result": PLAYLIST}).encode()
+        self.connections = 0
+        self.requests = 0
+        self.paths = []
+        self.bytes_received = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self._server.server_port}"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stub._lock:
+                    stub.connections += 1
+
+            def _reply(self):
+                # Drain uploads in small reads so large bodies never sit in memory here
+                remaining = int(self.headers.get("Content-Length", 0))
+                while remaining:
+                    received = len(self.rfile.read(min(remaining, 1 << 16)))
+                    if not received:
+                        break
+                    remaining -= received
+                    with stub._lock:
+                        stub.bytes_received += received
+                with stub._lock:
+                    stub.requests += 1
+                    stub.paths.append(self.path)
+                    fault = stub._random.random()
+                    slow = stub._random.random() < stub.slow_rate
+                    scripted = stub.script.pop(0) if stub.script else None
+                if scripted is not None:
+                    slow = scripted == "slow"
+                    fault = {"drop": 0.0, "error": stub.drop_rate}.get(scripted, 1.0)
+                time.sleep(stub.slow_latency if slow else stub.latency)
+                if fault < stub.drop_rate or scripted == "drop":
+                    self.close_connection = True
+                    return
+                if fault < stub.drop_rate + stub.error_rate or scripted == "error":
+                    self._send(503, "application/json", b'{"detail": "injected failure"}')
+                    return
+                if scripted == "bad_error":
+                    self._send(503, "application/json", b'{"detail": "inj')
+                    return
+                if scripted == "garbage":
+                    self._send(200, "text/html", b"<html>Bad gateway</html>")
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", stub.content_type)
+                if not stub.chunk_delay:
+                    self.send_header("Content-Length", str(len(stub.body)))
+                    self.end_headers()
+                    self.wfile.write(stub.body)
+                    return
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for start in range(0, len(stub.body), 64):
+                    chunk = stub.body[start:start + 64]
+                    self.wfile.write(b"%x\r\n%s\r\n" % (len(chunk), chunk))
+                    self.wfile.flush()
+                    time.sleep(stub.chunk_delay)
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _send(self, status, content_type, body):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _reply
+            do_POST = _reply
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def percentile(samples, pct):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
@@ -0,0 +1,94 @@
+"""
+Measure connection reuse of the pooled consoles against a local HTTP stand-in.
+
+Runs the same number of ``run_flow`` calls through the stock mira_sdk consoles
+and the pooled ones, reporting throughput and how many TCP connections the
+stub server had to accept.
+
+    python benchmarks/transport_bench.py --requests 500 --concurrency 16
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stub_server import StubServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from mira_sdk.mira.client.console import Console
+from mira_sdk.mira.client.async_console import AsyncConsole
+from moodify.transport import PoolConfig, PooledConsole
+from moodify.async_transport import PooledAsyncConsole
+
+FLOW_CONFIG = {"version": "1.0.0", "prompt": "x" * 10_000}
+INPUT = {"input": {"mood": "Happy"}}
+
+
+def bench_sync(console, requests, concurrency):
+    def one(_):
+        console.run_flow(FLOW_CONFIG, INPUT, None)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(one, range(requests)))
+    return time.perf_counter() - started
+
+
+async def bench_async(console, requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await console.run_flow(FLOW_CONFIG, INPUT)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(requests)))
+    return time.perf_counter() - started
+
+
+def run_case(name, stub, bench):
+    stub.connections = 0
+    elapsed = bench()
+    print(f"{name:<14} {stub.requests / elapsed:8.1f} req/s  {stub.connections:6d} connections")
+    stub.requests = 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.0, help="stub backend latency in seconds")
+    args = parser.parse_args()
+
+    stub = StubServer(latency=args.latency).start()
+    pool_config = PoolConfig(per_host_limit=args.concurrency)
+
+    def consoles(cls, **kwargs):
+        console = cls("bench", **kwargs)
+        console.base_url = stub.url
+        return console
+
+    run_case("sync", stub, lambda: bench_sync(consoles(Console), args.requests, args.concurrency))
+    pooled = consoles(PooledConsole, pool_config=pool_config)
+    run_case("sync pooled", stub, lambda: bench_sync(pooled, args.requests, args.concurrency))
+    pooled.close()
+
+    run_case("async", stub, lambda: asyncio.run(
+        bench_async(consoles(AsyncConsole), args.requests, args.concurrency)))
+
+    async def pooled_async():
+        console = consoles(PooledAsyncConsole, pool_config=pool_config)
+        try:
+            return await bench_async(console, args.requests, args.concurrency)
+        finally:
+            await console.close()
+
+    run_case("async pooled", stub, lambda: asyncio.run(pooled_async()))
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
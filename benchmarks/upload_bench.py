@@ -0,0 +1,102 @@
+"""
+Measure peak memory and throughput of knowledge source uploads against a local stand-in.
+
+Uploads a generated catalog CSV (200 MB by default, the API's limit) through
+the stock mira_sdk Console, the streaming PooledConsole and the
+KnowledgeUploader. The uploader is run twice to show a completed upload being
+skipped. Each case runs in its own process so the peak RSS figures do not
+mix.
+
+    python benchmarks/upload_bench.py --size-mb 200
+"""
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+from stub_server import StubServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+CASES = ("sdk", "pooled", "uploader")
+
+
+def write_catalog(path, size):
+    """Write a mood/track catalog CSV of exactly ``size`` bytes."""
+    block = "".join(
+        f"{i},Song {i},Album {i % 97},Artist {i % 311},{('Happy', 'Sad', 'Calm', 'Energetic')[i % 4]},{i % 101}\n"
+        for i in range(20_000)
+    ).encode()
+    with open(path, "wb") as f:
+        f.write(b"id,title,album,artist,mood,energy\n")
+        while f.tell() < size:
+            f.write(block[:size - f.tell()])
+
+
+def peak_rss_mb():
+    # ru_maxrss is reported in KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def run_case(case, url, path, state_dir):
+    """Upload in this process and return the timing and memory figures as a dict."""
+    from mira_sdk.mira.client.console import Console
+    from moodify.transport import PooledConsole
+    from moodify.upload import KnowledgeUploader
+
+    console = (Console if case == "sdk" else PooledConsole)("bench")
+    console.base_url = url
+    baseline = peak_rss_mb()
+    timings = []
+    if case == "uploader":
+        with KnowledgeUploader(console, state_dir=state_dir) as uploader:
+            for _ in range(2):
+                started = time.perf_counter()
+                uploader.upload("@bench/catalog", path)
+                timings.append(time.perf_counter() - started)
+    else:
+        started = time.perf_counter()
+        console.add_knowledge_from_file(path, "bench", "catalog")
+        timings.append(time.perf_counter() - started)
+    return {"seconds": timings, "rss_mb": peak_rss_mb() - baseline}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=200)
+    parser.add_argument("--case", choices=CASES, help=argparse.SUPPRESS)
+    parser.add_argument("--url", help=argparse.SUPPRESS)
+    parser.add_argument("--file", help=argparse.SUPPRESS)
+    parser.add_argument("--state-dir", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.case:
+        print(json.dumps(run_case(args.case, args.url, args.file, args.state_dir)))
+        return
+
+    stub = StubServer(body={"message": "ok"}).start()
+    size = int(args.size_mb * 1024 * 1024)
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "catalog.csv")
+        write_catalog(path, size)
+        for case in CASES:
+            output = subprocess.run(
+                [sys.executable, __file__, "--case", case, "--url", stub.url, "--file", path,
+                 "--state-dir", os.path.join(tmp, "state")],
+                check=True, capture_output=True, text=True,
+            ).stdout
+            result = json.loads(output.strip().splitlines()[-1])
+            first = result["seconds"][0]
+            line = f"{case:<9} {size / first / 1e6:8.1f} MB/s  peak RSS +{result['rss_mb']:7.1f} MB"
+            if len(result["seconds"]) > 1:
+                line += f"  re-run skipped in {result['seconds'][1] * 1000:.0f} ms"
+            print(line)
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,143 @@
+"""
+Compare cold-spawn and warm-pool throughput for moodify-test-local.py.
+
+A local stub stands in for the Mira flow API so only process start-up,
+imports, flow parsing and the client round trip are measured.
+
+    python benchmarks/worker_pool_bench.py --requests 200 --pool-size 4
+"""
+import argparse
+import itertools
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from stub_server import StubServer, percentile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SCRIPT = os.path.join(ROOT, "moodify-test-local.py")
+
+SAMPLE_INPUT = {
+    "mood": "Happy",
+    "activity": "Studying",
+    "energy_level": 70,
+    "genre": "Pop",
+    "time_of_day": "Morning",
+    "weather": "Sunny",
+    "wellness_needs": ["Focus"],
+    "music_pace": 60,
+}
+
+
+def report(name, latencies, elapsed):
+    print(
+        f"{name:<10} {len(latencies) / elapsed:8.1f} req/s  "
+        f"p50 {percentile(latencies, 50) * 1000:8.1f} ms  "
+        f"p99 {percentile(latencies, 99) * 1000:8.1f} ms"
+    )
+
+
+def bench_cold(env, requests, concurrency):
+    payload = json.dumps(SAMPLE_INPUT)
+
+    def one(_):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, SCRIPT, payload], env=env, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one, range(requests)))
+    return latencies, time.perf_counter() - started
+
+
+class Worker:
+    """moodify-test-local.py in worker mode, callable from many threads."""
+
+    def __init__(self, env):
+        self.process = subprocess.Popen(
+            [sys.executable, SCRIPT, "--worker"], env=env, text=True,
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+        )
+        self.lock = threading.Lock()
+        self.waiters = {}
+        self.replies = {}
+        ready = threading.Event()
+        self.waiters[None] = ready
+        threading.Thread(target=self._read, daemon=True).start()
+        ready.wait()
+
+    def _read(self):
+        for line in self.process.stdout:
+            message = json.loads(line)
+            if message.get("type") == "track":
+                continue
+            with self.lock:
+                event = self.waiters.pop(message.get("id"), None)
+                self.replies[message.get("id")] = message
+            if event is not None:
+                event.set()
+
+    def send(self, request):
+        """Send one request dict (its "id" must be unique) and return the final reply."""
+        done = threading.Event()
+        with self.lock:
+            self.waiters[request["id"]] = done
+            self.process.stdin.write(json.dumps(request) + "\n")
+            self.process.stdin.flush()
+        done.wait()
+        with self.lock:
+            return self.replies.pop(request["id"])
+
+    def call(self, request_id, input_data):
+        return self.send({"id": request_id, "input": input_data})
+
+    def close(self):
+        self.process.stdin.close()
+        self.process.wait()
+
+
+def bench_warm(env, requests, concurrency, pool_size):
+    workers = [Worker(env) for _ in range(pool_size)]
+    ids = itertools.count()
+
+    def one(i):
+        started = time.perf_counter()
+        workers[i % pool_size].call(str(next(ids)), SAMPLE_INPUT)
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        latencies = list(executor.map(one, range(requests)))
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.close()
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--pool-size", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05, help="stub backend latency in seconds")
+    args = parser.parse_args()
+
+    stub = StubServer(latency=args.latency).start()
+    env = dict(os.environ, API_KEY="bench", MIRA_BASE_URL=stub.url)
+    env["MOODIFY_WORKER_CONCURRENCY"] = str(args.concurrency)
+    # Every request is identical, so keep the response cache out of the measurement
+    env["MOODIFY_CACHE_TTL"] = "0"
+
+    report("cold", *bench_cold(env, args.requests, args.concurrency))
+    report("warm", *bench_warm(env, args.requests, args.concurrency, args.pool_size))
+    stub.stop()
+
+
+if __name__ == "__main__":
+    main()
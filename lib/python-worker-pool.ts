@@ -0,0 +1,348 @@
+import { spawn, ChildProcessWithoutNullStreams } from 'child_process';
+import readline from 'readline';
+
+export interface PythonWorkerPoolOptions {
+  pythonPath: string;
+  scriptPath: string;
+  size?: number;
+  // Requests a single worker serves before it is drained and replaced
+  maxRequestsPerWorker?: number;
+  // Requests a single worker runs in parallel
+  workerConcurrency?: number;
+  healthCheckIntervalMs?: number;
+  healthCheckTimeoutMs?: number;
+  requestTimeoutMs?: number;
+  // Delay before restarting after a worker fails to start, doubled per consecutive failure
+  respawnBackoffMs?: number;
+  maxRespawnBackoffMs?: number;
+}
+
+export type Track = {
+  position: number;
+  title: string;
+  album: string;
+  artist: string;
+};
+
+// Reply to a streamed run; the tracks themselves arrive through onTrack
+export type StreamSummary = {
+  tracks: number;
+};
+
+type Pending = {
+  resolve: (value: unknown) => void;
+  reject: (reason: Error) => void;
+  timer: NodeJS.Timeout;
+  onTrack?: (track: Track) => void;
+};
+
+type WorkerMessage = {
+  id?: string | null;
+  type?: string;
+  result?: unknown;
+  track?: Track;
+  error?: string;
+  traceback?: string;
+};
+
+class PythonWorker {
+  private process: ChildProcessWithoutNullStreams;
+  private pending = new Map<string, Pending>();
+  private nextId = 0;
+  private ready: Promise<void>;
+  private startFailure: Error | null = null;
+  // Slots taken by acquire() whose request has not been written to the worker yet
+  private reserved = 0;
+  served = 0;
+  started = false;
+  draining = false;
+  exited = false;
+
+  constructor(
+    private options: Required<PythonWorkerPoolOptions>,
+    private onReady: (worker: PythonWorker) => void,
+    // startError is set when the worker exited without ever becoming ready
+    private onExit: (worker: PythonWorker, startError: Error | null) => void,
+  ) {
+    this.process = spawn(options.pythonPath, [options.scriptPath, '--worker'], {
+      env: {
+        ...process.env,
+        MOODIFY_WORKER_CONCURRENCY: String(options.workerConcurrency),
+        MOODIFY_WORKER_MAX_REQUESTS: String(options.maxRequestsPerWorker),
+      },
+    });
+
+    let markReady!: () => void;
+    let failReady!: (err: Error) => void;
+    this.ready = new Promise((resolve, reject) => {
+      markReady = resolve;
+      failReady = reject;
+    });
+    // Avoid unhandled rejections when a worker dies before anyone awaited it
+    this.ready.catch(() => {});
+
+    readline.createInterface({ input: this.process.stdout }).on('line', (line) => {
+      let message: WorkerMessage;
+      try {
+        message = JSON.parse(line);
+      } catch {
+        console.error('Python worker emitted non-JSON output:', line);
+        return;
+      }
+      if (message.type === 'ready') {
+        this.started = true;
+        markReady();
+        this.onReady(this);
+        return;
+      }
+      this.settle(message);
+    });
+
+    this.process.stderr.on('data', (data) => {
+      console.error('Python worker stderr:', data.toString());
+    });
+
+    // Writing to a worker that just died raises EPIPE here; the 'close' handler rejects its requests
+    this.process.stdin.on('error', (err) => {
+      console.error('Python worker stdin error:', err.message);
+    });
+
+    this.process.on('error', (err) => {
+      console.error('Failed to start Python worker:', err);
+      this.startFailure = new Error(`Failed to start Python worker: ${err.message}`);
+      failReady(this.startFailure);
+    });
+
+    this.process.on('close', (code) => {
+      this.exited = true;
+      const startError = this.started
+        ? null
+        : this.startFailure ?? new Error(`Python worker exited with code ${code} before becoming ready`);
+      if (startError) {
+        failReady(startError);
+      }
+      for (const [id, pending] of this.pending) {
+        clearTimeout(pending.timer);
+        pending.reject(new Error(`Python worker exited with code ${code}`));
+        this.pending.delete(id);
+      }
+      this.onExit(this, startError);
+    });
+  }
+
+  get inFlight() {
+    return this.pending.size + this.reserved;
+  }
+
+  get available() {
+    return this.started && !this.exited && !this.draining && this.inFlight < this.options.workerConcurrency;
+  }
+
+  // Called synchronously when the pool picks this worker, so concurrent callers see the slot as taken
+  reserve() {
+    this.reserved += 1;
+    this.served += 1;
+    // The worker exits by itself after maxRequestsPerWorker, so stop routing to it
+    if (this.options.maxRequestsPerWorker && this.served >= this.options.maxRequestsPerWorker) {
+      this.draining = true;
+    }
+  }
+
+  private settle(message: WorkerMessage) {
+    const id = message.id ?? '';
+    const pending = this.pending.get(id);
+    if (!pending) {
+      return;
+    }
+    if (message.type === 'track') {
+      if (message.track) {
+        pending.onTrack?.(message.track);
+      }
+      return;
+    }
+    clearTimeout(pending.timer);
+    this.pending.delete(id);
+    if (message.error) {
+      pending.reject(new Error(message.traceback ? `${message.error}\n${message.traceback}` : message.error));
+    } else if (message.type === 'pong') {
+      pending.resolve(message);
+    } else {
+      pending.resolve(message.result);
+    }
+  }
+
+  private send(payload: Record<string, unknown>, timeoutMs: number, onTrack?: (track: Track) => void): Promise<unknown> {
+    const id = String(this.nextId++);
+    return new Promise((resolve, reject) => {
+      const timer = setTimeout(() => {
+        this.pending.delete(id);
+        reject(new Error(`Python worker did not respond within ${timeoutMs}ms`));
+      }, timeoutMs);
+      this.pending.set(id, { resolve, reject, timer, onTrack });
+      this.process.stdin.write(JSON.stringify({ ...payload, id }) + '\n');
+    });
+  }
+
+  // Runs a request in a slot taken with reserve(). With onTrack the worker streams
+  // tracks as they are generated and resolves with a StreamSummary
+  async run(inputData: unknown, onTrack?: (track: Track) => void): Promise<unknown> {
+    try {
+      await this.ready;
+    } finally {
+      // send() registers the request as pending in the same tick
+      this.reserved -= 1;
+    }
+    return this.send({ input: inputData, stream: Boolean(onTrack) }, this.options.requestTimeoutMs, onTrack);
+  }
+
+  async ping(): Promise<void> {
+    await this.ready;
+    await this.send({ type: 'ping' }, this.options.healthCheckTimeoutMs);
+  }
+
+  kill() {
+    this.draining = true;
+    this.process.kill();
+  }
+}
+
+export class PythonWorkerPool {
+  private options: Required<PythonWorkerPoolOptions>;
+  private workers: PythonWorker[] = [];
+  private waiting: Array<() => void> = [];
+  private healthTimer: NodeJS.Timeout;
+  private respawnTimers = new Set<NodeJS.Timeout>();
+  // Consecutive workers that exited before becoming ready, and the last reason
+  private startFailures = 0;
+  private startError: Error | null = null;
+  private closed = false;
+
+  constructor(options: PythonWorkerPoolOptions) {
+    this.options = {
+      size: 2,
+      maxRequestsPerWorker: 500,
+      workerConcurrency: 8,
+      healthCheckIntervalMs: 15000,
+      healthCheckTimeoutMs: 5000,
+      requestTimeoutMs: 120000,
+      respawnBackoffMs: 500,
+      maxRespawnBackoffMs: 30000,
+      ...options,
+    };
+    for (let i = 0; i < this.options.size; i++) {
+      this.spawnWorker();
+    }
+    this.healthTimer = setInterval(() => this.checkHealth(), this.options.healthCheckIntervalMs);
+    this.healthTimer.unref();
+  }
+
+  private spawnWorker() {
+    const worker = new PythonWorker(
+      this.options,
+      () => {
+        this.startFailures = 0;
+        this.startError = null;
+        this.wakeAll();
+      },
+      (exited, startError) => {
+        this.workers = this.workers.filter((w) => w !== exited);
+        if (this.closed) {
+          return;
+        }
+        if (startError) {
+          // A bad pythonPath or a missing API_KEY fails again straight away, so back off
+          // and let waiting requests fail instead of hanging until a worker comes up
+          this.startFailures += 1;
+          this.startError = startError;
+          this.wakeAll();
+        }
+        this.scheduleSpawn();
+      },
+    );
+    this.workers.push(worker);
+  }
+
+  private scheduleSpawn() {
+    if (this.startFailures === 0) {
+      this.spawnWorker();
+      return;
+    }
+    const delay = Math.min(
+      this.options.maxRespawnBackoffMs,
+      this.options.respawnBackoffMs * 2 ** (this.startFailures - 1),
+    );
+    const timer = setTimeout(() => {
+      this.respawnTimers.delete(timer);
+      this.spawnWorker();
+    }, delay);
+    timer.unref();
+    this.respawnTimers.add(timer);
+  }
+
+  private wakeWaiter() {
+    const next = this.waiting.shift();
+    if (next) {
+      next();
+    }
+  }
+
+  private wakeAll() {
+    for (const wake of this.waiting.splice(0)) {
+      wake();
+    }
+  }
+
+  private async acquire(): Promise<PythonWorker> {
+    for (;;) {
+      if (this.closed) {
+        throw new Error('Python worker pool is closed');
+      }
+      const candidates = this.workers.filter((w) => w.available);
+      if (candidates.length > 0) {
+        const worker = candidates.reduce((a, b) => (b.inFlight < a.inFlight ? b : a));
+        worker.reserve();
+        return worker;
+      }
+      if (this.startError && !this.workers.some((w) => w.started)) {
+        throw new Error(`Python worker pool cannot start workers: ${this.startError.message}`);
+      }
+      await new Promise<void>((resolve) => this.waiting.push(resolve));
+    }
+  }
+
+  private checkHealth() {
+    for (const worker of this.workers) {
+      if (worker.draining) {
+        continue;
+      }
+      worker.ping().catch((err) => {
+        console.error('Python worker failed health check, restarting:', err.message);
+        worker.kill();
+      });
+    }
+  }
+
+  run(inputData: unknown): Promise<unknown>;
+  run(inputData: unknown, onTrack: (track: Track) => void): Promise<StreamSummary>;
+  async run(inputData: unknown, onTrack?: (track: Track) => void): Promise<unknown> {
+    const worker = await this.acquire();
+    try {
+      return await worker.run(inputData, onTrack);
+    } finally {
+      this.wakeWaiter();
+    }
+  }
+
+  close() {
+    this.closed = true;
+    clearInterval(this.healthTimer);
+    for (const timer of this.respawnTimers) {
+      clearTimeout(timer);
+    }
+    this.respawnTimers.clear();
+    for (const worker of this.workers) {
+      worker.kill();
+    }
+    this.wakeAll();
+  }
+}
@@ -1,12 +1,23 @@
+import time
+
+# Taken before any other import so the "startup" phase covers imports and flow loading
+SCRIPT_STARTED = time.perf_counter()
+
 import sys
 import os
+import json
+import traceback
 
 # Add virtual environment site-packages to Python path
 venv_path = os.path.expanduser('~/building-your-own-flows/venv/lib/python3.10/site-packages')
 sys.path.append(venv_path)
 
 try:
-    from mira_sdk import MiraClient, Flow
+    from moodify.snapshot import default_snapshot_dir, load_flow
+    from moodify.transport import PooledMiraClient
+    from moodify.cache import CachedFlowOperations, DiskCache, LRUCache
+    from moodify.resilience import CircuitBreaker, HedgePolicy, Resilience, RetryPolicy
+    from moodify import metrics
 except ImportError as e:
     print(json.dumps({
         "error": f"Failed to import mira_sdk: {str(e)}",
@@ -16,25 +27,143 @@ except ImportError as e:
     sys.exit(1)
 
 from dotenv import load_dotenv
-import json
-import traceback
 
 # Load environment variables from .env file
 load_dotenv()
 
+FLOW_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "flow.yaml")
+
+# Per-request phase timings are appended here as JSON lines when set
+if os.getenv("MOODIFY_TRACE_FILE"):
+    metrics.add_trace_hook(metrics.TraceWriter(os.getenv("MOODIFY_TRACE_FILE")))
+
+
+def use_base_url_override(console):
+    # Lets benchmarks and local testing point the client at a stub backend
+    base_url = os.getenv("MIRA_BASE_URL")
+    if base_url:
+        console.base_url = base_url.rstrip("/")
+
+
+def optional_float(name):
+    value = os.getenv(name)
+    return float(value) if value else None
+
+
+def build_resilience():
+    """Deadline, retry, hedging and circuit breaker settings for the flow API, from the environment."""
+    hedge_percentile = optional_float("MOODIFY_HEDGE_PERCENTILE")
+    return Resilience(
+        default_timeout=float(os.getenv("MOODIFY_TIMEOUT", "120")),
+        attempt_timeout=optional_float("MOODIFY_ATTEMPT_TIMEOUT"),
+        retry=RetryPolicy(max_attempts=int(os.getenv("MOODIFY_RETRY_ATTEMPTS", "3"))),
+        hedge=HedgePolicy(percentile=hedge_percentile) if hedge_percentile else None,
+        breaker=CircuitBreaker(
+            failure_threshold=int(os.getenv("MOODIFY_BREAKER_THRESHOLD", "5")),
+            reset_timeout=float(os.getenv("MOODIFY_BREAKER_RESET", "30")),
+        ),
+    )
+
+
+def build_runtime():
+    """Create the Mira client and parse flow.yaml once so they can be reused across requests."""
+    api_key = os.getenv("API_KEY")
+    if not api_key:
+        raise ValueError("API_KEY not found in environment variables")
+
+    # A pooled client keeps the TLS connection to the flow API alive between requests
+    client = PooledMiraClient(config={"API_KEY": api_key}, resilience=build_resilience())
+    use_base_url_override(client._console)
+
+    # Near-identical mood requests share one cached upstream call
+    ttl = float(os.getenv("MOODIFY_CACHE_TTL", "3600"))
+    if ttl > 0:
+        cache_dir = os.getenv("MOODIFY_CACHE_DIR")
+        client.flow = CachedFlowOperations(
+            client.flow,
+            memory=LRUCache(maxsize=int(os.getenv("MOODIFY_CACHE_SIZE", "1024")), ttl=ttl),
+            disk=DiskCache(cache_dir, ttl=ttl) if cache_dir else None,
+        )
+
+    # Unchanged flow.yaml is loaded from a parsed snapshot instead of being re-parsed
+    flow = load_flow(FLOW_PATH, snapshot_dir=os.getenv("MOODIFY_FLOW_SNAPSHOT_DIR", default_snapshot_dir()))
+    metrics.record("startup", time.perf_counter() - SCRIPT_STARTED)
+    return client, flow
+
+
+class StreamRuntime:
+    """Asyncio loop on a background thread owning the pooled async client used for streaming."""
+
+    def __init__(self, flow, resilience=None):
+        import asyncio
+        import threading
+        from moodify.async_transport import PooledAsyncMiraClient
+
+        self._asyncio = asyncio
+        self.flow_config = flow.to_dict()
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, daemon=True).start()
+        self.client = PooledAsyncMiraClient(config={"API_KEY": os.getenv("API_KEY")}, resilience=resilience)
+        use_base_url_override(self.client.console)
+
+    def stream(self, input_data, emit, timeout=None):
+        """Call emit(track) for each playlist track as it arrives and return the track count."""
+        import contextvars
+
+        print(f"Streaming input data received: {json.dumps(input_data)}", file=sys.stderr)
+        # The coroutine runs on the loop thread; carry over the caller's trace so its phases are recorded
+        caller_context = contextvars.copy_context()
+
+        async def run():
+            for var, value in caller_context.items():
+                var.set(value)
+            count = 0
+            async for track in self.client.flow.stream(self.flow_config, input_data, timeout=timeout):
+                emit(track)
+                count += 1
+            return count
+
+        return self._asyncio.run_coroutine_threadsafe(run(), self.loop).result()
+
+    def close(self):
+        self._asyncio.run_coroutine_threadsafe(self.client.close(), self.loop).result()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def run_flow(client, flow, input_data, timeout=None):
+    print(f"Input data received: {json.dumps(input_data)}", file=sys.stderr)
+    return client.flow.test(flow, input_data, timeout=timeout)
+
+
 def generate_playlist(input_data):
     try:
-        api_key = os.getenv("API_KEY")
-        if not api_key:
-            raise ValueError("API_KEY not found in environment variables")
+        with metrics.trace(input=input_data):
+            client, flow = build_runtime()
+            response = run_flow(client, flow, input_data)
+        print(json.dumps(response))
 
-        print(f"Input data received: {json.dumps(input_data)}", file=sys.stderr)
+    except Exception as e:
+        error_details = {
+            "error": str(e),
+            "traceback": traceback.format_exc()
+        }
+        print(json.dumps(error_details), file=sys.stderr)
+        sys.exit(1)
 
-        client = MiraClient(config={"API_KEY": api_key})
-        flow = Flow(source="flow.yaml")
 
-        response = client.flow.test(flow, input_data)
-        print(json.dumps(response))
+def stream_playlist(input_data):
+    """Print each track as its own NDJSON line, followed by a summary line."""
+    try:
+        client, flow = build_runtime()
+        runtime = StreamRuntime(flow, client._console.resilience)
+
+        def emit(track):
+            sys.stdout.write(json.dumps({"type": "track", "track": track.as_dict()}) + "\n")
+            sys.stdout.flush()
+
+        count = runtime.stream(input_data, emit)
+        runtime.close()
+        print(json.dumps({"type": "done", "tracks": count}))
 
     except Exception as e:
         error_details = {
@@ -44,8 +173,127 @@ def generate_playlist(input_data):
         print(json.dumps(error_details), file=sys.stderr)
         sys.exit(1)
 
+
+def serve(concurrency, max_requests=0):
+    """
+    Long-lived worker mode speaking JSON lines on stdin/stdout.
+
+    Each request line is {"id": ..., "input": {...}} or {"id": ..., "type": "ping"}.
+    Each reply line is {"id": ..., "result": ...} or {"id": ..., "error": ..., "traceback": ...}.
+    Requests with "stream": true first get one {"id": ..., "type": "track", "track": {...}}
+    line per playlist track, then {"id": ..., "result": {"tracks": count}}.
+    Requests with "trace": true also get their per-phase timings in "phases", and
+    {"id": ..., "type": "metrics"} returns all metrics in OpenMetrics text format.
+    A request's optional "timeout" (seconds) is its deadline across retries;
+    error replies carry the exception class in "error_type" and whether the
+    caller may retry in "retryable".
+    The client and parsed flow stay warm for the life of the process. When
+    max_requests is set the worker stops reading after that many requests,
+    finishes the in-flight ones and exits so the pool can replace it.
+    """
+    # Only worker mode needs these, so keep them off the one-shot start-up path
+    import threading
+    from concurrent.futures import ThreadPoolExecutor
+
+    client, flow = build_runtime()
+    write_lock = threading.Lock()
+    served = 0
+    stream_runtime = None
+    stream_lock = threading.Lock()
+
+    def get_stream_runtime():
+        nonlocal stream_runtime
+        with stream_lock:
+            if stream_runtime is None:
+                # Share the breaker and latency history with the one-shot client
+                stream_runtime = StreamRuntime(flow, client._console.resilience)
+            return stream_runtime
+
+    def reply(message):
+        line = json.dumps(message)
+        with write_lock:
+            sys.stdout.write(line + "\n")
+            sys.stdout.flush()
+
+    def handle(request_id, input_data, stream, include_phases, timeout):
+        message = {"id": request_id}
+        try:
+            with metrics.trace(request_id, input=input_data, stream=stream) as request_trace:
+                if stream:
+                    count = get_stream_runtime().stream(
+                        input_data,
+                        lambda track: reply({"id": request_id, "type": "track", "track": track.as_dict()}),
+                        timeout,
+                    )
+                    message["result"] = {"tracks": count}
+                else:
+                    message["result"] = run_flow(client, flow, input_data, timeout)
+        except Exception as e:
+            message = {
+                "id": request_id,
+                "error": str(e),
+                "error_type": type(e).__name__,
+                "retryable": bool(getattr(e, "retryable", False)),
+                "traceback": traceback.format_exc(),
+            }
+        if include_phases:
+            message["phases"] = request_trace.phases
+            message["total"] = request_trace.total
+        reply(message)
+
+    reply({"type": "ready", "pid": os.getpid()})
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for line in sys.stdin:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                reply({"id": None, "error": f"Invalid request line: {str(e)}"})
+                continue
+
+            request_id = request.get("id")
+            if request.get("type") == "ping":
+                pong = {"id": request_id, "type": "pong", "served": served}
+                if isinstance(client.flow, CachedFlowOperations):
+                    pong["cache"] = client.flow.stats.as_dict()
+                reply(pong)
+                continue
+            if request.get("type") == "metrics":
+                reply({"id": request_id, "type": "metrics", "metrics": metrics.render()})
+                continue
+
+            executor.submit(
+                handle,
+                request_id,
+                request.get("input", {}),
+                bool(request.get("stream")),
+                bool(request.get("trace")),
+                request.get("timeout"),
+            )
+            served += 1
+            if max_requests and served >= max_requests:
+                break
+
+    if stream_runtime is not None:
+        stream_runtime.close()
+
+
 if __name__ == "__main__":
     try:
+        if len(sys.argv) > 1 and sys.argv[1] == "--worker":
+            serve(
+                concurrency=int(os.getenv("MOODIFY_WORKER_CONCURRENCY", "8")),
+                max_requests=int(os.getenv("MOODIFY_WORKER_MAX_REQUESTS", "0")),
+            )
+            sys.exit(0)
+
+        if len(sys.argv) > 2 and sys.argv[1] == "--stream":
+            stream_playlist(json.loads(sys.argv[2]))
+            sys.exit(0)
+
         if len(sys.argv) <= 1:
             raise ValueError("No input data provided")
 
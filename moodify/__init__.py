@@ -0,0 +1,55 @@
+"""
+Runtime helpers layered on top of mira_sdk for the Moodify playlist flow.
+
+Names are resolved lazily, so ``import moodify`` does not pull in
+mira_sdk, requests, aiohttp or PyYAML until a helper is first used.
+"""
+import importlib
+
+_EXPORTS = {
+    "PoolConfig": "transport",
+    "PooledConsole": "transport",
+    "PooledMiraClient": "transport",
+    "PooledAsyncConsole": "async_transport",
+    "PooledAsyncMiraClient": "async_transport",
+    "BatchResult": "batch",
+    "TokenBucket": "batch",
+    "run_many": "batch",
+    "BandingCanonicalizer": "cache",
+    "CachedFlowOperations": "cache",
+    "DiskCache": "cache",
+    "LRUCache": "cache",
+    "CompiledFlow": "template",
+    "PromptTemplate": "template",
+    "load_flow": "snapshot",
+    "load_flow_config": "snapshot",
+    "CircuitBreaker": "resilience",
+    "HedgePolicy": "resilience",
+    "Resilience": "resilience",
+    "RetryPolicy": "resilience",
+    "deadline": "resilience",
+    "CircuitOpenError": "exceptions",
+    "DeadlineExceeded": "exceptions",
+    "HTTPStatusError": "exceptions",
+    "MiraRequestError": "exceptions",
+    "TransportError": "exceptions",
+    "TransportTimeout": "exceptions",
+    "KnowledgeUploader": "upload",
+    "MultipartBody": "upload",
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module_name = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}") from None
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
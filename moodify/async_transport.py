@@ -0,0 +1,400 @@
+"""
+Keep-alive connection pooling for the asyncio Mira console.
+
+mira_sdk's AsyncConsole builds and tears down a whole ``aiohttp.ClientSession``
+per request. PooledAsyncConsole keeps one session and connector for the life
+of the client. The client here is built directly on AsyncConsole rather than
+on ``mira_sdk.mira.client.async_mira_client``, which does not import cleanly
+in current SDK releases.
+
+As with PooledConsole, failed calls raise the typed errors in
+``moodify.exceptions`` and an optional Resilience policy adds deadlines,
+retries, hedging and circuit breaking.
+
+The SDK's async ``KnowledgeOperations.add`` does not send files properly, so
+AsyncKnowledgeOperations runs the streaming ``moodify.upload`` engine in
+worker threads instead.
+"""
+import asyncio
+import codecs
+import json
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, AsyncIterable, AsyncIterator, Dict, Iterable, Optional, Union
+
+import aiohttp
+
+from mira_sdk import Flow
+from mira_sdk.mira.client.async_console import AsyncConsole
+from mira_sdk.mira.utils.util import split_name
+
+from . import metrics
+from .batch import BatchResult, run_many
+from .exceptions import DeadlineExceeded, HTTPStatusError, ResponseDecodeError, TransportError
+from .resilience import Resilience, attempt_timeout, deadline
+from .streaming import JsonStringFieldDecoder, Track, TrackParser
+from .transport import RUN_FLOW_PATH, PoolConfig, PooledConsole, _retry_after, _retry_safe, _timeout_error
+
+if TYPE_CHECKING:
+    from .upload import KnowledgeUploader, ProgressCallback
+
+
+def _encode_json(value) -> bytes:
+    return json.dumps(value, allow_nan=False).encode("utf-8")
+
+
+class PooledAsyncConsole(AsyncConsole):
+    """
+    AsyncConsole that shares one aiohttp.ClientSession and connector across calls.
+
+    Args:
+        api_key: Mira API key
+        pool_config: Connection pool settings
+        resilience: Optional deadline/retry/hedging/circuit breaker policy
+    """
+
+    def __init__(self, api_key, pool_config: PoolConfig = None, resilience: Optional[Resilience] = None):
+        super().__init__(api_key)
+        self.pool_config = pool_config or PoolConfig()
+        self.resilience = resilience
+        self._session = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # The session must be created inside a running event loop
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_config.pool_maxsize,
+                limit_per_host=self.pool_config.per_host_limit,
+                keepalive_timeout=self.pool_config.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.pool_config.dns_cache_ttl,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers={"MiraAuthorization": f"{self.api_key}"},
+            )
+        return self._session
+
+    async def _request(self, method, path, query_params=None, json_data=None, files=None, data=None):
+        """
+        Send one API call and return the decoded JSON response.
+
+        Raises:
+            HTTPStatusError: On a non-200 response
+            TransportError: If no response arrived (TransportTimeout for timeouts)
+            ResponseDecodeError: If a 200 response is not valid JSON
+            DeadlineExceeded: If the call deadline expired
+            CircuitOpenError: If the circuit breaker is open
+        """
+        url = f"{self.base_url}/{path}"
+        headers = None
+        if json_data is not None:
+            # Encode here rather than inside aiohttp so the cost lands in "encode", not "network"
+            with metrics.phase("encode"):
+                data = _encode_json(json_data)
+            headers = {"Content-Type": "application/json"}
+
+        async def send(timeout):
+            try:
+                with metrics.phase("network"):
+                    async with self._get_session().request(
+                        method,
+                        url,
+                        params=query_params,
+                        data=data,
+                        headers=headers,
+                        timeout=aiohttp.ClientTimeout(total=timeout),
+                    ) as response:
+                        if response.status != 200:
+                            text = await response.text()
+                            raise HTTPStatusError(response.status, text, _retry_after(response.headers))
+                        body = await response.read()
+            except asyncio.TimeoutError as e:
+                raise _timeout_error(e) from e
+            except aiohttp.ClientError as e:
+                raise TransportError(f"An error occurred: {e}") from e
+            try:
+                with metrics.phase("decode"):
+                    return json.loads(body)
+            except ValueError as e:
+                raise ResponseDecodeError(f"Response is not valid JSON: {e}") from e
+
+        if self.resilience is None:
+            return await send(attempt_timeout())
+        return await self.resilience.call_async(send, _retry_safe(method, path, files))
+
+    async def execute_flow(self, author_name, flow_name, input_dict, version=None):
+        # The SDK sends version=None, which aiohttp rejects as a query value
+        path = f"v1/flows/flows/{author_name}/{flow_name}"
+        params = {"version": version} if version else None
+        return await self._request(method="post", path=path, json_data=input_dict, query_params=params)
+
+    async def stream_run_flow(
+            self, flow_config, input_dict, field: str = "result", timeout: Optional[float] = None
+    ) -> AsyncIterator[str]:
+        """
+        Like run_flow, but yield the flow's text output as chunks arrive.
+
+        JSON replies are decoded incrementally through the given field; any
+        other content type is passed through as text.
+
+        The stream is never retried or hedged, since text may already have
+        been yielded. ``timeout`` (or the enclosing deadline) bounds the whole
+        stream, and the circuit breaker still applies.
+
+        Raises:
+            HTTPStatusError: On a non-200 response
+            TransportError: On transport errors (TransportTimeout for timeouts)
+            DeadlineExceeded: If the call deadline expired
+        """
+        url = f"{self.base_url}/{RUN_FLOW_PATH}"
+        with metrics.phase("encode"):
+            body = _encode_json({
+                "flow_config": flow_config,
+                "input": input_dict
+            })
+        utf8 = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        default_timeout = self.resilience.default_timeout if self.resilience is not None else None
+        # Only the time budget is taken from the deadline; the context must not be held across yields
+        with deadline(timeout):
+            client_timeout = aiohttp.ClientTimeout(total=attempt_timeout(default_timeout))
+        if self.resilience is not None:
+            self.resilience.admit()
+        error = None
+        # Timed by hand: a phase() block would also count the consumer's time between yields
+        started = time.perf_counter()
+        try:
+            async with self._get_session().post(
+                    url, data=body, headers={"Content-Type": "application/json"}, timeout=client_timeout
+            ) as response:
+                metrics.record("network", time.perf_counter() - started)
+                started = time.perf_counter()
+                if response.status != 200:
+                    text = await response.text()
+                    raise HTTPStatusError(response.status, text, _retry_after(response.headers))
+                decoder = JsonStringFieldDecoder(field) if "json" in response.content_type else None
+                async for chunk in response.content.iter_any():
+                    text = utf8.decode(chunk)
+                    text = decoder.feed(text) if decoder is not None else text
+                    if text:
+                        yield text
+                text = utf8.decode(b"", final=True)
+                if decoder is not None:
+                    text = decoder.feed(text) + decoder.close()
+                if text:
+                    yield text
+                metrics.record("stream", time.perf_counter() - started)
+        except HTTPStatusError as e:
+            error = e
+            raise
+        except asyncio.TimeoutError as e:
+            # The stream's only timeout is its whole-call budget
+            error = DeadlineExceeded(f"Deadline exceeded: {e}")
+            raise error from e
+        except aiohttp.ClientError as e:
+            error = TransportError(f"An error occurred: {e}")
+            raise error from e
+        except BaseException as e:
+            # Closed early or cancelled: record() frees a half-open probe without a verdict
+            error = e
+            raise
+        finally:
+            if self.resilience is not None:
+                self.resilience.record(error)
+
+    async def close(self):
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        if self.resilience is not None:
+            self.resilience.close()
+
+
+class AsyncFlowOperations:
+    def __init__(self, console):
+        self.console = console
+
+    @staticmethod
+    def _flow_config(flow: Union[Flow, Dict[str, Any], str, Path]) -> Dict[str, Any]:
+        if isinstance(flow, (str, Path)):
+            flow = Flow(source=flow)
+        return flow.to_dict() if isinstance(flow, Flow) else flow
+
+    async def run(
+            self,
+            flow: Union[Flow, Dict[str, Any], str, Path],
+            input_dict: dict,
+            timeout: Optional[float] = None
+    ):
+        """
+        Run a flow definition without deploying it.
+
+        Args:
+            flow: A loaded Flow, its ``to_dict()`` config, or a path to a flow YAML file
+            input_dict: Values for the flow's inputs
+            timeout: Deadline in seconds for the run, including retries
+        """
+        with deadline(timeout):
+            return await self.console.run_flow(self._flow_config(flow), input_dict)
+
+    async def run_many(
+            self,
+            flow: Union[Flow, Dict[str, Any], str, Path],
+            inputs: Union[Iterable[dict], AsyncIterable[dict]],
+            concurrency: int = 8,
+            rate_limit: Optional[float] = None,
+            burst: Optional[float] = None,
+            timeout: Optional[float] = None
+    ) -> AsyncIterator[BatchResult]:
+        """
+        Run a flow once per input dict, yielding results as they complete.
+
+        Args:
+            flow: A loaded Flow, its ``to_dict()`` config, or a path to a flow YAML file
+            inputs: Iterable or async iterable of input dicts, consumed lazily
+            concurrency: Maximum flow runs in flight at once
+            rate_limit: Optional maximum flow runs started per second
+            burst: Token bucket capacity when rate_limit is set
+            timeout: Deadline in seconds for each flow run, including retries
+
+        Examples:
+            >>> async for item in client.flow.run_many(flow, combos, concurrency=16, rate_limit=5):
+            ...     store(item.index, item.result) if item.ok else log(item.index, item.error)
+        """
+        flow_config = self._flow_config(flow)
+
+        async def run_one(input_dict):
+            with deadline(timeout):
+                return await self.console.run_flow(flow_config, input_dict)
+
+        async for item in run_many(run_one, inputs, concurrency, rate_limit, burst):
+            yield item
+
+    async def stream(
+            self,
+            flow: Union[Flow, Dict[str, Any], str, Path],
+            input_dict: dict,
+            timeout: Optional[float] = None
+    ) -> AsyncIterator[Track]:
+        """
+        Run a flow and yield playlist tracks as soon as each line has been generated.
+
+        Repeated title/artist pairs are dropped, so the stream honours the
+        flow's ``unique: true`` playlist constraint. ``timeout`` bounds the
+        whole stream in seconds.
+
+        Examples:
+            >>> async for track in client.flow.stream(flow, input_data):
+            ...     print(track.position, track.title, track.artist)
+        """
+        parser = TrackParser()
+        async for text in self.console.stream_run_flow(self._flow_config(flow), input_dict, timeout=timeout):
+            for track in parser.feed(text):
+                yield track
+        for track in parser.close():
+            yield track
+
+    async def execute(self, flow_name: str, input_dict: dict, timeout: Optional[float] = None):
+        """Run a deployed flow given as ``author/name`` or ``author/name/version``."""
+        version = None
+        if len(flow_name.split("/")) > 2:
+            version = flow_name.split("/")[-1]
+        org, name = split_name(flow_name)
+        with deadline(timeout):
+            return await self.console.execute_flow(org, name, input_dict, version)
+
+
+class AsyncKnowledgeOperations:
+    """
+    Knowledge source uploads for the async client.
+
+    Each file goes through a KnowledgeUploader (streamed body, bounded
+    memory, resumable batches) on a sync PooledConsole that copies the async
+    console's API key, base URL, pool settings and resilience policy. Uploads
+    run in worker threads via ``asyncio.to_thread``, so the deadline context
+    carries over and the event loop is never blocked on file I/O.
+
+    Args:
+        console: The client's PooledAsyncConsole
+        concurrency: Files uploaded at once by add_many
+        state_dir: Directory for upload records; None disables resume
+        progress: Optional ``progress(file_path, sent_bytes, total_bytes)`` callback, called from upload threads
+
+    Examples:
+        >>> async for item in client.knowledge.add_many("@me/moods", glob.glob("catalog/*.csv")):
+        ...     print(item.input, "ok" if item.ok else item.error)
+    """
+
+    def __init__(
+            self,
+            console: PooledAsyncConsole,
+            concurrency: int = 4,
+            state_dir: Optional[str] = None,
+            progress: Optional["ProgressCallback"] = None
+    ):
+        self.console = console
+        self.concurrency = concurrency
+        self.state_dir = state_dir
+        self.progress = progress
+        self._uploader = None
+
+    def _get_uploader(self) -> "KnowledgeUploader":
+        # Imported here to keep the upload engine off the playlist start-up path
+        from .upload import KnowledgeUploader
+
+        if self._uploader is None:
+            upload_console = PooledConsole(self.console.api_key, self.console.pool_config, self.console.resilience)
+            upload_console.base_url = self.console.base_url
+            self._uploader = KnowledgeUploader(
+                upload_console, concurrency=self.concurrency, state_dir=self.state_dir, progress=self.progress
+            )
+        return self._uploader
+
+    async def add(self, knowledge_name: str, file_path: str):
+        """
+        Upload one file to a dataset given as ``author/name``, unless it was already uploaded.
+
+        Raises:
+            FileNotFoundError, PermissionError, ValueError: As KnowledgeOperations.add_source
+            IOError: If the file changed while it was being uploaded
+        """
+        return await asyncio.to_thread(self._get_uploader().upload, knowledge_name, file_path)
+
+    async def add_many(
+            self, knowledge_name: str, file_paths: Union[Iterable[str], AsyncIterable[str]]
+    ) -> AsyncIterator[BatchResult]:
+        """Upload files ``concurrency`` at a time, yielding a BatchResult per file in completion order."""
+        async for item in run_many(lambda path: self.add(knowledge_name, path), file_paths, self.concurrency):
+            yield item
+
+    def close(self) -> None:
+        if self._uploader is not None:
+            self._uploader.close()
+            self._uploader.console.close()
+            self._uploader = None
+
+
+class PooledAsyncMiraClient:
+    """
+    Async Mira client backed by a PooledAsyncConsole.
+
+    Examples:
+        >>> async with PooledAsyncMiraClient(config={"API_KEY": key}, resilience=Resilience()) as client:
+        ...     await client.flow.run(flow, input_data, timeout=30)
+    """
+
+    def __init__(self, config=None, pool_config: PoolConfig = None, resilience: Optional[Resilience] = None):
+        self.config = config or {}
+        self.console = PooledAsyncConsole(self.config.get("API_KEY"), pool_config, resilience)
+        self.flow = AsyncFlowOperations(self.console)
+        self.knowledge = AsyncKnowledgeOperations(self.console)
+
+    async def close(self):
+        self.knowledge.close()
+        await self.console.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
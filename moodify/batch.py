@@ -0,0 +1,123 @@
+"""
+Bounded, rate-limited fan-out of async calls over large input streams.
+
+run_many pulls inputs lazily and keeps at most ``concurrency`` calls in
+flight, so memory stays flat no matter how many inputs the iterable yields.
+Results come back in completion order, tagged with their input index.
+"""
+import asyncio
+import time
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, AsyncIterator, Awaitable, Callable, Iterable, Optional, Union
+
+
+@dataclass
+class BatchResult:
+    """Outcome of one input in a batch; exactly one of ``result``/``error`` is meaningful."""
+    index: int
+    input: Any
+    result: Any = None
+    error: Optional[BaseException] = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+class TokenBucket:
+    """
+    Async token bucket.
+
+    Args:
+        rate: Tokens added per second
+        burst: Bucket capacity (default: max(1, rate))
+    """
+
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = burst if burst is not None else max(1.0, rate)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+async def _iterate(inputs: Union[Iterable, AsyncIterable]) -> AsyncIterator:
+    if hasattr(inputs, "__aiter__"):
+        async for item in inputs:
+            yield item
+    else:
+        for item in inputs:
+            yield item
+
+
+async def run_many(
+        fn: Callable[[Any], Awaitable[Any]],
+        inputs: Union[Iterable, AsyncIterable],
+        concurrency: int = 8,
+        rate_limit: Optional[float] = None,
+        burst: Optional[float] = None
+) -> AsyncIterator[BatchResult]:
+    """
+    Apply ``fn`` to every input and yield a BatchResult per input as each completes.
+
+    Args:
+        fn: Coroutine function called once per input
+        inputs: Iterable or async iterable of inputs, consumed lazily
+        concurrency: Maximum calls in flight at once
+        rate_limit: Optional maximum call starts per second
+        burst: Token bucket capacity when rate_limit is set
+
+    Failures of individual calls are returned on their BatchResult and never
+    abort the batch. Closing the generator early cancels in-flight calls.
+    """
+    if concurrency < 1:
+        raise ValueError("concurrency must be at least 1")
+    bucket = TokenBucket(rate_limit, burst) if rate_limit else None
+
+    async def run(index, item):
+        try:
+            if bucket is not None:
+                await bucket.acquire()
+            return BatchResult(index, item, result=await fn(item))
+        except Exception as e:
+            return BatchResult(index, item, error=e)
+
+    iterator = _iterate(inputs).__aiter__()
+    pending = set()
+    next_index = 0
+    exhausted = False
+    try:
+        while True:
+            while not exhausted and len(pending) < concurrency:
+                try:
+                    item = await iterator.__anext__()
+                except StopAsyncIteration:
+                    exhausted = True
+                    break
+                pending.add(asyncio.ensure_future(run(next_index, item)))
+                next_index += 1
+
+            if not pending:
+                return
+
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                yield task.result()
+    finally:
+        for task in pending:
+            task.cancel()
+        if pending:
+            await asyncio.gather(*pending, return_exceptions=True)
@@ -0,0 +1,310 @@
+"""
+Response cache with input canonicalization and single-flight for flow runs.
+
+Playlist requests that differ only in letter case or by a few points on the
+0-100 sliders produce equivalent playlists, so CachedFlowOperations keys
+responses on a canonical form of the inputs plus a hash of the flow config
+(bumping ``version`` in flow.yaml invalidates every entry). Concurrent
+identical requests share one upstream call.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from dataclasses import dataclass, field, fields
+from typing import Any, Callable, Dict, Optional
+
+from mira_sdk import Flow
+
+from .exceptions import DeadlineExceeded
+from .resilience import deadline, remaining
+
+_MISSING = object()
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    disk_hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def incr(self, name: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, name, getattr(self, name) + amount)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {f.name: getattr(self, f.name) for f in fields(self) if not f.name.startswith("_")}
+
+
+class BandingCanonicalizer:
+    """
+    Default input canonicalizer.
+
+    Strings are stripped and case-folded, integers in 0-100 are replaced by
+    their band index and lists are canonicalized element-wise and sorted.
+    When a Flow is given, only inputs it declares as ``string``/``integer``
+    are treated that way; otherwise the Python value type decides.
+
+    Args:
+        band_width: Width of each integer band (default: 10)
+    """
+
+    def __init__(self, band_width: int = 10):
+        self.band_width = band_width
+
+    def _value(self, value, declared_type=None):
+        if isinstance(value, str) and declared_type in (None, "string"):
+            return value.strip().casefold()
+        if isinstance(value, int) and not isinstance(value, bool) and declared_type in (None, "integer"):
+            if 0 <= value <= 100:
+                # 100 joins the top band instead of getting one of its own
+                return f"band:{min(value, 99) // self.band_width}"
+            return value
+        if isinstance(value, (list, tuple)):
+            return sorted((self._value(v) for v in value), key=repr)
+        return value
+
+    def __call__(self, input_dict: Dict[str, Any], flow: Optional[Flow] = None) -> Dict[str, Any]:
+        declared = {name: spec.type for name, spec in flow.inputs.items()} if flow is not None else {}
+        return {
+            name: self._value(value, declared.get(name))
+            for name, value in input_dict.items()
+        }
+
+
+def flow_fingerprint(flow: Flow) -> str:
+    """Stable hash of a flow's full config, including its version."""
+    encoded = json.dumps(flow.to_dict(), sort_keys=True, default=str)
+    return hashlib.sha256(encoded.encode()).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-memory LRU with a per-entry TTL."""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 3600, stats: Optional[CacheStats] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.stats = stats or CacheStats()
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                self.stats.incr("expirations")
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: str, value) -> None:
+        expires_at = time.monotonic() + self.ttl if self.ttl else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.stats.incr("evictions")
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class DiskCache:
+    """On-disk JSON tier, one file per key, written atomically."""
+
+    def __init__(self, directory: str, ttl: Optional[float] = 86400, stats: Optional[CacheStats] = None):
+        self.directory = directory
+        self.ttl = ttl
+        self.stats = stats or CacheStats()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str):
+        path = self._path(key)
+        try:
+            with open(path, "r") as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return _MISSING
+        if self.ttl and entry.get("stored_at", 0) + self.ttl < time.time():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            self.stats.incr("expirations")
+            return _MISSING
+        return entry.get("value")
+
+    def set(self, key: str, value) -> None:
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump({"stored_at": time.time(), "value": value}, f)
+            os.replace(tmp_path, self._path(key))
+        except (OSError, TypeError, ValueError):
+            # An unwritable or unserialisable entry only costs a future miss
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+
+class SingleFlight:
+    """Coalesce concurrent calls for the same key into one execution."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._inflight: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]):
+        """
+        Run ``fn`` unless a call for ``key`` is already in flight, in which case wait for it.
+
+        Followers wait no longer than the current deadline.
+
+        Returns:
+            (result, shared) where ``shared`` is True if the result came from another caller
+
+        Raises:
+            DeadlineExceeded: If the deadline expires while waiting on another caller
+        """
+        with self._lock:
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+
+        if not leader:
+            try:
+                return future.result(timeout=remaining()), True
+            except FutureTimeoutError:
+                raise DeadlineExceeded("Deadline exceeded waiting for a coalesced flow run", sent=False)
+
+        try:
+            future.set_result(fn())
+        except BaseException as e:
+            future.set_exception(e)
+        finally:
+            with self._lock:
+                del self._inflight[key]
+        return future.result(), False
+
+
+def _cacheable(input_dict: Dict[str, Any]) -> bool:
+    # File/Reader inputs point at local content the key cannot see
+    try:
+        json.dumps(input_dict)
+    except TypeError:
+        return False
+    return True
+
+
+class CachedFlowOperations:
+    """
+    Caching wrapper around mira_sdk's FlowOperations.
+
+    Args:
+        operations: The client's ``flow`` operations to wrap
+        canonicalizer: Callable ``(input_dict, flow) -> dict`` used to build cache keys
+        memory: In-memory tier (default: LRUCache())
+        disk: Optional on-disk tier consulted after a memory miss
+
+    Examples:
+        >>> client.flow = CachedFlowOperations(client.flow, disk=DiskCache(".cache/flows"))
+        >>> client.flow.test(flow, {"mood": "Happy", "energy_level": 72})
+        >>> client.flow.stats.as_dict()
+    """
+
+    def __init__(
+            self,
+            operations,
+            canonicalizer: Optional[Callable[..., Dict[str, Any]]] = None,
+            memory: Optional[LRUCache] = None,
+            disk: Optional[DiskCache] = None
+    ):
+        self._operations = operations
+        self.canonicalizer = canonicalizer or BandingCanonicalizer()
+        self.stats = CacheStats()
+        # An empty LRUCache is falsy, so test for None rather than truthiness
+        self.memory = memory if memory is not None else LRUCache()
+        self.memory.stats = self.stats
+        self.disk = disk
+        if disk is not None:
+            disk.stats = self.stats
+        self._single_flight = SingleFlight()
+
+    def __getattr__(self, name):
+        # Everything that is not cached goes straight to the wrapped operations
+        return getattr(self._operations, name)
+
+    def _key(self, scope: str, input_dict: Dict[str, Any], flow: Optional[Flow]) -> str:
+        canonical = json.dumps(self.canonicalizer(input_dict, flow), sort_keys=True, default=str)
+        return hashlib.sha256(f"{scope}\0{canonical}".encode()).hexdigest()
+
+    def _cached(self, key: str, call: Callable[[], Any]):
+        value = self.memory.get(key)
+        if value is not _MISSING:
+            self.stats.incr("hits")
+            return value
+
+        def load():
+            # A caller that missed just before the previous leader finished must not call upstream again
+            value = self.memory.get(key)
+            if value is not _MISSING:
+                self.stats.incr("hits")
+                return value
+            if self.disk is not None:
+                stored = self.disk.get(key)
+                if stored is not _MISSING:
+                    self.stats.incr("disk_hits")
+                    self.memory.set(key, stored)
+                    return stored
+            self.stats.incr("misses")
+            result = call()
+            # The plain SDK console returns None for transport errors; never pin those
+            if result is not None:
+                self.memory.set(key, result)
+                if self.disk is not None:
+                    self.disk.set(key, result)
+            return result
+
+        result, shared = self._single_flight.do(key, load)
+        if shared:
+            self.stats.incr("coalesced")
+        return result
+
+    def test(self, flow, input_dict: dict, composio_config=None, timeout: Optional[float] = None):
+        # The deadline travels in context, so the wrapped operations need no timeout argument
+        with deadline(timeout):
+            if composio_config is not None or not isinstance(flow, Flow) or not _cacheable(input_dict):
+                return self._operations.test(flow, input_dict, composio_config)
+            key = self._key(f"test:{flow_fingerprint(flow)}", input_dict, flow)
+            return self._cached(key, lambda: self._operations.test(flow, input_dict, composio_config))
+
+    def execute(self, flow_name: str, input_dict: dict, composio_config=None, timeout: Optional[float] = None):
+        # Deployed flows are keyed by name; pin a version in flow_name for precise invalidation
+        with deadline(timeout):
+            if composio_config is not None or not _cacheable(input_dict):
+                return self._operations.execute(flow_name, input_dict, composio_config)
+            key = self._key(f"execute:{flow_name}", input_dict, None)
+            return self._cached(key, lambda: self._operations.execute(flow_name, input_dict, composio_config))
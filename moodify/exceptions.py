@@ -0,0 +1,67 @@
+"""
+Typed errors raised by the pooled consoles.
+
+All subclass mira_sdk's FlowError, so existing ``except FlowError`` handlers
+keep working. ``retryable`` tells callers whether repeating the call can help.
+"""
+from typing import Any, Optional
+
+from mira_sdk.exceptions import FlowError
+
+
+class MiraRequestError(FlowError):
+    """Base exception for failed calls to the Mira API"""
+
+    retryable = False
+
+
+class TransportError(MiraRequestError):
+    """Raised when the request could not be sent or no response arrived"""
+
+    retryable = True
+
+
+class TransportTimeout(TransportError):
+    """Raised when a single attempt timed out while the call deadline still had time left"""
+    pass
+
+
+class ResponseDecodeError(MiraRequestError):
+    """Raised when a 200 response is not valid JSON, as when a proxy answers with an HTML page"""
+
+    retryable = True
+
+
+class DeadlineExceeded(MiraRequestError):
+    """
+    Raised when the call deadline expires before a successful response.
+
+    ``sent`` is False when the deadline had already passed before the request
+    went out, so the error says nothing about the backend.
+    """
+
+    def __init__(self, message: str, sent: bool = True):
+        super().__init__(message)
+        self.sent = sent
+
+
+class CircuitOpenError(MiraRequestError):
+    """Raised without calling the backend while the circuit breaker is open"""
+    pass
+
+
+class HTTPStatusError(MiraRequestError):
+    """Raised for any non-200 response"""
+
+    # Statuses worth another attempt: throttling and gateway/availability errors
+    RETRYABLE_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+    def __init__(self, status: int, detail: Any = None, retry_after: Optional[float] = None):
+        super().__init__(f"Response status: {status}, detail: {detail}")
+        self.status = status
+        self.detail = detail
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self) -> bool:
+        return self.status in self.RETRYABLE_STATUSES
@@ -0,0 +1,233 @@
+"""
+Per-phase latency instrumentation.
+
+Code paths wrap their phases in ``phase("name")``. Each phase is recorded in
+a latency histogram, attached to the current request trace (if one is open)
+and passed to any registered hooks. ``render()`` returns every metric in
+OpenMetrics text format, and a TraceWriter appends one JSON line per traced
+request.
+
+Phases recorded by this package:
+    startup        script start until the client and flow are ready
+    yaml_load      parsing flow YAML (or reading its snapshot)
+    flow_load      building the Flow from its config
+    render         rendering the prompt template
+    encode         building and JSON-encoding the request body
+    network        sending the request and receiving the response (for
+                   streamed runs, until the response headers arrive)
+    stream         receiving a streamed flow run's body
+    decode         decoding the response JSON
+"""
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0,
+)
+
+PhaseHook = Callable[[str, float, Dict[str, Any]], None]
+
+_current_trace: ContextVar[Optional["Trace"]] = ContextVar("moodify_trace", default=None)
+
+
+class Histogram:
+    """Cumulative-bucket latency histogram in seconds."""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class Counter:
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: int = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    inner = ",".join(f'{key}="{value}"' for key, value in sorted(labels.items()))
+    return "{" + inner + "}"
+
+
+class Registry:
+    """Named, labelled histograms and counters with OpenMetrics text output."""
+
+    def __init__(self):
+        self._histograms: Dict[Tuple[str, Tuple], Histogram] = {}
+        self._counters: Dict[Tuple[str, Tuple], Counter] = {}
+        self._help: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def histogram(self, name: str, help: str = "", **labels: str) -> Histogram:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._histograms:
+                self._histograms[key] = Histogram()
+                self._help.setdefault(name, help)
+            return self._histograms[key]
+
+    def counter(self, name: str, help: str = "", **labels: str) -> Counter:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            if key not in self._counters:
+                self._counters[key] = Counter()
+                self._help.setdefault(name, help)
+            return self._counters[key]
+
+    def render(self) -> str:
+        """Return all metrics in OpenMetrics text exposition format."""
+        lines: List[str] = []
+        with self._lock:
+            histograms = sorted(self._histograms.items())
+            counters = sorted(self._counters.items())
+
+        described = set()
+        for (name, labels), histogram in histograms:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} histogram")
+            labels = dict(labels)
+            with histogram._lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip(histogram.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{name}_bucket{_labels({**labels, 'le': le})} {cumulative}")
+            lines.append(f"{name}_sum{_labels(labels)} {total}")
+            lines.append(f"{name}_count{_labels(labels)} {count}")
+
+        for (name, labels), counter in counters:
+            if name not in described:
+                described.add(name)
+                lines.append(f"# HELP {name} {self._help.get(name, '')}")
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}_total{_labels(dict(labels))} {counter.value}")
+
+        lines.append("# EOF")
+        return "\n".join(lines) + "\n"
+
+
+class Trace:
+    """Phase timings collected for one request."""
+
+    def __init__(self, request_id: Any = None, **attrs: Any):
+        self.request_id = request_id
+        self.attrs = attrs
+        self.phases: Dict[str, float] = {}
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.total: Optional[float] = None
+        self.error: Optional[str] = None
+
+    def add(self, name: str, seconds: float) -> None:
+        self.phases[name] = self.phases.get(name, 0.0) + seconds
+
+    def as_dict(self) -> Dict[str, Any]:
+        record = {
+            "request_id": self.request_id,
+            "ts": self.started_at,
+            "total": self.total,
+            "phases": self.phases,
+        }
+        record.update(self.attrs)
+        if self.error is not None:
+            record["error"] = self.error
+        return record
+
+
+class TraceWriter:
+    """Append each finished trace as one JSON line, like the repo's requests.jsonl."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, trace: Trace) -> None:
+        line = json.dumps(trace.as_dict(), default=str)
+        with self._lock, open(self.path, "a") as f:
+            f.write(line + "\n")
+
+
+registry = Registry()
+_phase_hooks: List[PhaseHook] = []
+_trace_hooks: List[Callable[[Trace], None]] = []
+
+
+def add_phase_hook(hook: PhaseHook) -> None:
+    """Register ``hook(phase, seconds, attrs)``, called after every phase."""
+    _phase_hooks.append(hook)
+
+
+def add_trace_hook(hook: Callable[[Trace], None]) -> None:
+    """Register ``hook(trace)``, called when a request trace finishes (e.g. a TraceWriter)."""
+    _trace_hooks.append(hook)
+
+
+def record(name: str, seconds: float, **attrs: Any) -> None:
+    """Record an already-measured phase."""
+    registry.histogram(
+        "moodify_phase_seconds", "Time spent in each request phase", phase=name
+    ).observe(seconds)
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add(name, seconds)
+    for hook in _phase_hooks:
+        hook(name, seconds, attrs)
+
+
+@contextmanager
+def phase(name: str, **attrs: Any) -> Iterator[None]:
+    """Time the enclosed block as phase ``name``."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started, **attrs)
+
+
+@contextmanager
+def trace(request_id: Any = None, **attrs: Any) -> Iterator[Trace]:
+    """Collect the phases of one request and hand the finished trace to the trace hooks."""
+    current = Trace(request_id, **attrs)
+    token = _current_trace.set(current)
+    outcome = "ok"
+    try:
+        yield current
+    except BaseException as e:
+        current.error = str(e)
+        outcome = "error"
+        raise
+    finally:
+        _current_trace.reset(token)
+        current.total = time.perf_counter() - current._started
+        registry.histogram("moodify_request_seconds", "End-to-end request latency").observe(current.total)
+        registry.counter("moodify_requests", "Requests handled", outcome=outcome).inc()
+        for hook in _trace_hooks:
+            hook(current)
+
+
+def render() -> str:
+    return registry.render()
@@ -0,0 +1,399 @@
+"""
+Deadlines, retries, hedged requests and circuit breaking for console calls.
+
+One Resilience object wraps each attempt of a request for both the sync and
+the async pooled consoles:
+
+- A per-call deadline, opened with ``deadline(seconds)`` (FlowOperations
+  ``timeout=``), bounds every attempt and all retries. Nested deadlines keep
+  the earliest expiry.
+- Retry-safe calls are retried with full-jitter exponential backoff on
+  transport errors and retryable statuses (429/5xx), honouring Retry-After.
+- Retry-safe calls may also be hedged: if no reply arrives within the recent
+  latency percentile, a duplicate is sent and the first success wins.
+- A circuit breaker fails fast with CircuitOpenError while the backend keeps
+  failing, then lets a probe through after ``reset_timeout``.
+"""
+import asyncio
+import contextvars
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Iterator, Optional
+
+from . import metrics
+from .exceptions import CircuitOpenError, DeadlineExceeded, HTTPStatusError, MiraRequestError
+
+_deadline: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("moodify_deadline", default=None)
+
+
+@contextmanager
+def deadline(seconds: Optional[float]) -> Iterator[None]:
+    """Bound every console call made inside the block to ``seconds`` from now; None leaves it unbounded."""
+    if seconds is None:
+        yield
+        return
+    expires_at = time.monotonic() + seconds
+    current = _deadline.get()
+    token = _deadline.set(expires_at if current is None else min(current, expires_at))
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left before the current deadline, or ``default`` when none is set."""
+    expires_at = _deadline.get()
+    if expires_at is None:
+        return default
+    return expires_at - time.monotonic()
+
+
+def attempt_timeout(limit: Optional[float] = None) -> Optional[float]:
+    """
+    Timeout for the next attempt: the deadline's remaining time, capped at ``limit``.
+
+    Raises:
+        DeadlineExceeded: If the deadline has already passed
+    """
+    left = remaining()
+    if left is not None and left <= 0:
+        raise DeadlineExceeded("Deadline exceeded before the request could be sent", sent=False)
+    if limit is None:
+        return left
+    return limit if left is None else min(left, limit)
+
+
+@dataclass
+class RetryPolicy:
+    """
+    Exponential backoff with full jitter for retry-safe calls.
+
+    Args:
+        max_attempts: Total attempts including the first
+        base_delay: Backoff ceiling for the first retry, in seconds
+        max_delay: Largest backoff, also the cap applied to Retry-After
+        multiplier: Growth of the backoff ceiling per retry
+    """
+    max_attempts: int = 3
+    base_delay: float = 0.2
+    max_delay: float = 5.0
+    multiplier: float = 2.0
+
+    def backoff(self, attempt: int, error: BaseException) -> float:
+        """Full-jitter delay before retry number ``attempt`` (1-based)."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1)))
+        retry_after = getattr(error, "retry_after", None)
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+
+@dataclass
+class HedgePolicy:
+    """
+    Send a duplicate attempt when the first is slower than recent traffic.
+
+    Args:
+        percentile: Latency percentile after which to hedge
+        min_samples: Observations needed before hedging starts
+        min_delay: Never hedge sooner than this many seconds
+    """
+    percentile: float = 95.0
+    min_samples: int = 20
+    min_delay: float = 0.05
+
+
+class LatencyTracker:
+    """Sliding window of recent successful attempt latencies."""
+
+    def __init__(self, size: int = 256):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct: float, min_samples: int = 1) -> Optional[float]:
+        with self._lock:
+            if len(self._samples) < min_samples:
+                return None
+            ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class CircuitBreaker:
+    """
+    Closed/open/half-open circuit breaker.
+
+    Args:
+        failure_threshold: Consecutive failures that open the circuit
+        reset_timeout: Seconds the circuit stays open before a probe is allowed
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    raise CircuitOpenError("Circuit breaker is open; the Mira API is failing")
+                self.state = self.HALF_OPEN
+            if self.state == self.HALF_OPEN:
+                if self._probing:
+                    raise CircuitOpenError("Circuit breaker is half-open; a probe request is in flight")
+                self._probing = True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+            self._probing = False
+
+    def release(self) -> None:
+        """Free the half-open probe slot after a call that gave no verdict on the backend."""
+        with self._lock:
+            self._probing = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._failures += 1
+            self._probing = False
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    metrics.registry.counter("moodify_circuit_opened", "Times the circuit breaker opened").inc()
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+def _discard_outcome(task: asyncio.Future) -> None:
+    # Losing hedged attempts may still finish with an error; nobody awaits them
+    if not task.cancelled():
+        task.exception()
+
+
+def _counts_against_backend(error: BaseException) -> bool:
+    # 4xx other than throttling says nothing about backend health
+    if isinstance(error, HTTPStatusError):
+        return error.retryable
+    # Nor does a deadline that ran out before the request was sent
+    if isinstance(error, DeadlineExceeded):
+        return error.sent
+    return isinstance(error, MiraRequestError)
+
+
+class Resilience:
+    """
+    Shared resilience policy for a console.
+
+    Args:
+        default_timeout: Deadline applied when the caller set none (None: unbounded)
+        attempt_timeout: Upper bound for a single attempt
+        retry: RetryPolicy, or None to disable retries
+        hedge: HedgePolicy, or None to disable hedging
+        breaker: CircuitBreaker; a default one is used when None
+    """
+
+    def __init__(
+            self,
+            default_timeout: Optional[float] = 120.0,
+            attempt_timeout: Optional[float] = None,
+            retry: Optional[RetryPolicy] = RetryPolicy(),
+            hedge: Optional[HedgePolicy] = None,
+            breaker: Optional[CircuitBreaker] = None
+    ):
+        self.default_timeout = default_timeout
+        self.attempt_timeout = attempt_timeout
+        self.retry = retry
+        self.hedge = hedge
+        self.breaker = breaker if breaker is not None else CircuitBreaker()
+        self.latency = LatencyTracker()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def _hedge_delay(self) -> Optional[float]:
+        if self.hedge is None:
+            return None
+        delay = self.latency.percentile(self.hedge.percentile, self.hedge.min_samples)
+        return None if delay is None else max(delay, self.hedge.min_delay)
+
+    def _should_retry(self, error: BaseException, attempt: int, retry_safe: bool) -> Optional[float]:
+        """Return the backoff before the next attempt, or None to give up."""
+        if not retry_safe or self.retry is None or attempt >= self.retry.max_attempts:
+            return None
+        if not getattr(error, "retryable", False):
+            return None
+        delay = self.retry.backoff(attempt, error)
+        left = remaining()
+        if left is not None and delay >= left:
+            return None
+        metrics.registry.counter("moodify_retries", "Retried console attempts").inc()
+        return delay
+
+    def admit(self) -> None:
+        """
+        Check the circuit breaker before a call made outside call()/call_async().
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        if self.breaker is not None:
+            self.breaker.before_call()
+
+    def record(self, error: Optional[BaseException]) -> None:
+        """
+        Report the outcome of a call admitted with admit(); None means success.
+
+        Every admitted call must be reported, whatever it raised (including
+        cancellation), or a half-open breaker would wait on its probe forever.
+        """
+        if self.breaker is None:
+            return
+        if error is None:
+            self.breaker.record_success()
+        elif _counts_against_backend(error):
+            self.breaker.record_failure()
+        elif isinstance(error, HTTPStatusError):
+            # The backend answered, so a half-open probe has done its job
+            self.breaker.record_success()
+        else:
+            self.breaker.release()
+
+    # --- sync ---
+
+    def _pool(self) -> ThreadPoolExecutor:
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=64, thread_name_prefix="moodify-hedge")
+            return self._executor
+
+    def _timed(self, send: Callable[[Optional[float]], Any]) -> Any:
+        started = time.perf_counter()
+        result = send(attempt_timeout(self.attempt_timeout))
+        self.latency.observe(time.perf_counter() - started)
+        return result
+
+    def _attempt_sync(self, send: Callable[[Optional[float]], Any], retry_safe: bool) -> Any:
+        hedge_delay = self._hedge_delay() if retry_safe else None
+        if hedge_delay is None:
+            return self._timed(send)
+
+        pool = self._pool()
+        # Each attempt gets its own copy of the context so deadlines and traces carry over
+        futures = {pool.submit(contextvars.copy_context().run, self._timed, send)}
+        done, _ = wait(futures, timeout=hedge_delay)
+        if not done:
+            metrics.registry.counter("moodify_hedged_requests", "Hedged duplicate attempts").inc()
+            futures.add(pool.submit(contextvars.copy_context().run, self._timed, send))
+        done, _ = wait(futures, timeout=remaining(), return_when=FIRST_COMPLETED)
+        if not done:
+            raise DeadlineExceeded("Deadline exceeded waiting for a response")
+        # A failed attempt goes straight back to the retry loop rather than waiting on a slow sibling
+        for future in done:
+            if future.exception() is None:
+                return future.result()
+        raise next(iter(done)).exception()
+
+    def call(self, send: Callable[[Optional[float]], Any], retry_safe: bool) -> Any:
+        """
+        Run ``send(timeout)`` under the policy and return its result.
+
+        Args:
+            send: Performs one attempt; receives the attempt timeout in seconds (or None)
+            retry_safe: Whether the request may be repeated (retries and hedging)
+        """
+        with deadline(None if remaining() is not None else self.default_timeout):
+            attempt = 0
+            while True:
+                attempt += 1
+                self.admit()
+                try:
+                    result = self._attempt_sync(send, retry_safe)
+                except MiraRequestError as e:
+                    self.record(e)
+                    delay = self._should_retry(e, attempt, retry_safe)
+                    if delay is None:
+                        raise
+                    time.sleep(delay)
+                    continue
+                except BaseException as e:
+                    self.record(e)
+                    raise
+                self.record(None)
+                return result
+
+    # --- async ---
+
+    async def _timed_async(self, send: Callable[[Optional[float]], Awaitable[Any]]) -> Any:
+        started = time.perf_counter()
+        result = await send(attempt_timeout(self.attempt_timeout))
+        self.latency.observe(time.perf_counter() - started)
+        return result
+
+    async def _attempt_async(self, send: Callable[[Optional[float]], Awaitable[Any]], retry_safe: bool) -> Any:
+        hedge_delay = self._hedge_delay() if retry_safe else None
+        if hedge_delay is None:
+            return await self._timed_async(send)
+
+        tasks = {asyncio.ensure_future(self._timed_async(send))}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=hedge_delay)
+            if not done:
+                metrics.registry.counter("moodify_hedged_requests", "Hedged duplicate attempts").inc()
+                tasks.add(asyncio.ensure_future(self._timed_async(send)))
+            done, _ = await asyncio.wait(tasks, timeout=remaining(), return_when=asyncio.FIRST_COMPLETED)
+            if not done:
+                raise DeadlineExceeded("Deadline exceeded waiting for a response")
+            for task in done:
+                if task.exception() is None:
+                    return task.result()
+            raise next(iter(done)).exception()
+        finally:
+            for task in tasks:
+                task.cancel()
+                task.add_done_callback(_discard_outcome)
+
+    async def call_async(self, send: Callable[[Optional[float]], Awaitable[Any]], retry_safe: bool) -> Any:
+        """Async counterpart of call(); ``send(timeout)`` is a coroutine function."""
+        with deadline(None if remaining() is not None else self.default_timeout):
+            attempt = 0
+            while True:
+                attempt += 1
+                self.admit()
+                try:
+                    result = await self._attempt_async(send, retry_safe)
+                except MiraRequestError as e:
+                    self.record(e)
+                    delay = self._should_retry(e, attempt, retry_safe)
+                    if delay is None:
+                        raise
+                    await asyncio.sleep(delay)
+                    continue
+                except BaseException as e:
+                    self.record(e)
+                    raise
+                self.record(None)
+                return result
+
+    def close(self) -> None:
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None
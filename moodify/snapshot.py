@@ -0,0 +1,110 @@
+"""
+Fast flow loading: libyaml parsing and content-hashed config snapshots.
+
+mira_sdk parses flow YAML with the pure-Python ``yaml.safe_load``. load_flow
+uses the libyaml C loader when PyYAML was built with it and stores the parsed
+config as JSON under a hash of the file's bytes, so an unchanged flow.yaml is
+never parsed as YAML again.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+import yaml
+
+from mira_sdk.mira.exceptions import LoadError
+
+from . import metrics
+
+# Bump when the snapshot layout changes so stale files are ignored
+SNAPSHOT_FORMAT = 1
+
+SafeLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def default_snapshot_dir() -> str:
+    cache_home = os.getenv("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(cache_home, "moodify", "flows")
+
+
+def load_yaml_fast(data: Union[str, bytes]) -> Dict[str, Any]:
+    """Parse YAML with the C loader when available, falling back to the pure-Python one."""
+    return yaml.load(data, Loader=SafeLoader)
+
+
+def _write_snapshot(path: str, config: Dict[str, Any]) -> None:
+    directory = os.path.dirname(path)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    except OSError:
+        return
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(config, f)
+        os.replace(tmp_path, path)
+    except (OSError, TypeError, ValueError):
+        # Configs JSON cannot represent, or a read-only cache, just skip the snapshot
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+
+
+def load_flow_config(path: Union[str, Path], snapshot_dir: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Load a flow YAML file as a config dict, reusing a snapshot when the file is unchanged.
+
+    Args:
+        path: Path to the flow YAML file
+        snapshot_dir: Directory for snapshots; None disables them
+
+    Raises:
+        LoadError: If the file cannot be read or parsed
+    """
+    with metrics.phase("yaml_load"):
+        return _load_flow_config(path, snapshot_dir)
+
+
+def _load_flow_config(path: Union[str, Path], snapshot_dir: Optional[str] = None) -> Dict[str, Any]:
+    try:
+        data = Path(path).read_bytes()
+    except OSError as e:
+        raise LoadError(f"Failed to load YAML from {path}: {str(e)}")
+
+    snapshot_path = None
+    if snapshot_dir:
+        digest = hashlib.sha256(data).hexdigest()
+        snapshot_path = os.path.join(snapshot_dir, f"{digest}.v{SNAPSHOT_FORMAT}.json")
+        try:
+            with open(snapshot_path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            pass
+
+    try:
+        config = load_yaml_fast(data)
+    except yaml.YAMLError as e:
+        raise LoadError(f"Failed to load YAML from {path}: {str(e)}")
+
+    if snapshot_path is not None:
+        _write_snapshot(snapshot_path, config)
+    return config
+
+
+def load_flow(path: Union[str, Path], snapshot_dir: Optional[str] = None, flow_class=None):
+    """
+    Build a flow from a YAML file through load_flow_config.
+
+    Args:
+        path: Path to the flow YAML file
+        snapshot_dir: Directory for snapshots; None disables them
+        flow_class: Flow class to construct (default: CompiledFlow)
+    """
+    if flow_class is None:
+        from .template import CompiledFlow
+        flow_class = CompiledFlow
+    return flow_class(source=load_flow_config(path, snapshot_dir))
@@ -0,0 +1,193 @@
+"""
+Incremental parsing of streamed playlist output.
+
+The flow answers with ``Song Title, Album, Artist`` lines, usually wrapped in
+a JSON envelope such as ``{"result": "1. Song, Album, Artist\\n..."}``.
+JsonStringFieldDecoder pulls that string out of the body chunk by chunk and
+TrackParser turns completed lines into Track records, dropping duplicates to
+enforce the flow's ``unique: true`` playlist constraint.
+"""
+import json
+import re
+from dataclasses import dataclass, asdict
+from typing import Any, Dict, List, Optional
+
+_NUMBERING = re.compile(r"^\s*(?:[-*•]\s*)?(?:\d+\s*[.)]\s*)?")
+_DECORATION = "*_\"'` "
+
+
+@dataclass
+class Track:
+    position: int
+    title: str
+    album: str
+    artist: str
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class TrackParser:
+    """
+    Turn a stream of text into Track records, one per completed line.
+
+    Lines that do not have at least ``title, album, artist`` are ignored, as
+    are repeats of a title/artist pair already emitted and lines ending in a
+    colon, which introduce the list rather than belong to it. Lines of a
+    JSON array (``"1. Song, Album, Artist",``) are unwrapped first.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._seen = set()
+        self.count = 0
+
+    def _parse_line(self, line: str) -> Optional[Track]:
+        line = line.strip().rstrip(",[]").lstrip("[").strip(_DECORATION)
+        if line.endswith(":"):
+            return None
+        line = _NUMBERING.sub("", line).strip()
+        fields = [field.strip(_DECORATION) for field in line.rsplit(",", 2)]
+        if len(fields) != 3 or not all(fields):
+            return None
+        title, album, artist = fields
+        key = (title.casefold(), artist.casefold())
+        if key in self._seen:
+            return None
+        self._seen.add(key)
+        self.count += 1
+        return Track(position=self.count, title=title, album=album, artist=artist)
+
+    def feed(self, text: str) -> List[Track]:
+        self._buffer += text
+        *lines, self._buffer = self._buffer.split("\n")
+        return [track for track in map(self._parse_line, lines) if track is not None]
+
+    def close(self) -> List[Track]:
+        line, self._buffer = self._buffer, ""
+        track = self._parse_line(line)
+        return [track] if track is not None else []
+
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+class JsonStringFieldDecoder:
+    """
+    Decode the string value of one top-level JSON field incrementally.
+
+    ``feed`` returns whatever part of the field's value became available with
+    that chunk. The raw body is kept (playlist replies are a few KB) so that
+    ``close`` can fall back to a full parse when the field is missing or is
+    not a string.
+
+    Args:
+        field: Name of the field holding the text (default: "result")
+    """
+
+    def __init__(self, field: str = "result"):
+        self.field = field
+        self._needle = json.dumps(field)
+        self._raw = []
+        self._scan = ""
+        self._state = "seek"
+        self._pending_escape = ""
+        self._emitted = False
+
+    def _decode(self, text: str) -> str:
+        out = []
+        i = 0
+        text = self._pending_escape + text
+        self._pending_escape = ""
+        while i < len(text):
+            char = text[i]
+            if char == '"':
+                self._state = "done"
+                break
+            if char != "\\":
+                out.append(char)
+                i += 1
+                continue
+            if i + 1 >= len(text):
+                self._pending_escape = text[i:]
+                break
+            code = text[i + 1]
+            if code == "u":
+                if i + 6 > len(text):
+                    self._pending_escape = text[i:]
+                    break
+                point = int(text[i + 2:i + 6], 16)
+                if 0xD800 <= point < 0xDC00:
+                    # Astral characters arrive as a surrogate pair of \u escapes
+                    if i + 12 > len(text):
+                        self._pending_escape = text[i:]
+                        break
+                    low = int(text[i + 8:i + 12], 16)
+                    point = 0x10000 + ((point - 0xD800) << 10) + (low - 0xDC00)
+                    i += 12
+                else:
+                    i += 6
+                out.append(chr(point))
+            else:
+                out.append(_ESCAPES.get(code, code))
+                i += 2
+        decoded = "".join(out)
+        if decoded:
+            self._emitted = True
+        return decoded
+
+    def feed(self, chunk: str) -> str:
+        self._raw.append(chunk)
+        if self._state == "done":
+            return ""
+        if self._state == "string":
+            return self._decode(chunk)
+
+        self._scan += chunk
+        if self._state == "seek":
+            index = self._scan.find(self._needle)
+            if index < 0:
+                # Keep enough tail to match a key split across chunks
+                self._scan = self._scan[-len(self._needle):]
+                return ""
+            self._scan = self._scan[index + len(self._needle):]
+            self._state = "colon"
+
+        stripped = self._scan.lstrip()
+        if self._state == "colon":
+            if not stripped:
+                return ""
+            if stripped[0] != ":":
+                self._state = "seek"
+                self._scan = stripped
+                return self.feed("")
+            stripped = stripped[1:].lstrip()
+            self._scan = stripped
+            self._state = "value"
+
+        if self._state == "value":
+            if not stripped:
+                return ""
+            if stripped[0] != '"':
+                # Not a string; close() will recover the text from the full body
+                self._state = "done"
+                return ""
+            self._state = "string"
+            self._scan = ""
+            return self._decode(stripped[1:])
+        return ""
+
+    def close(self) -> str:
+        """Return text that could only be recovered from the complete body."""
+        if self._emitted:
+            return ""
+        body = "".join(self._raw)
+        try:
+            value = json.loads(body)
+        except ValueError:
+            return body
+        if isinstance(value, dict):
+            value = value.get(self.field, value)
+        if isinstance(value, dict):
+            value = next((v for v in value.values() if isinstance(v, str)), json.dumps(value))
+        return value if isinstance(value, str) else json.dumps(value)
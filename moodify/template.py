@@ -0,0 +1,170 @@
+"""
+Precompiled prompt templates for flows.
+
+mira_sdk's ``Flow.render_prompt`` recomputes the required-input set and runs
+``str.format`` over the whole prompt on every call, and
+``validate_prompt_variables`` re-splits the prompt on ``{`` each time. A
+PromptTemplate is parsed once into literal and placeholder segments, so
+rendering is a single join and validation is a set lookup.
+
+Only ``{identifier}`` is a placeholder. ``{{`` and ``}}`` still render as
+single braces for prompts written against ``str.format``, and any other brace,
+such as a JSON example inside the prompt, is kept as literal text instead of
+breaking rendering.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, FrozenSet, Mapping, Optional, Tuple, Union
+
+from mira_sdk import Flow
+from mira_sdk.mira.exceptions import ValidationError
+
+from . import metrics
+
+_TOKEN = re.compile(r"\{\{|\}\}|\{([A-Za-z_][A-Za-z0-9_]*)\}")
+
+
+@lru_cache(maxsize=64)
+def _parse(source: str) -> Tuple[Tuple[str, ...], Tuple[Tuple[int, str], ...]]:
+    """Split a prompt into a parts list and the (index, name) of each placeholder slot."""
+    parts = []
+    slots = []
+    literal = []
+    position = 0
+    for match in _TOKEN.finditer(source):
+        literal.append(source[position:match.start()])
+        position = match.end()
+        name = match.group(1)
+        if name is None:
+            literal.append(match.group(0)[0])
+            continue
+        parts.append("".join(literal))
+        literal = []
+        slots.append((len(parts), name))
+        parts.append("")
+    literal.append(source[position:])
+    parts.append("".join(literal))
+    return tuple(parts), tuple(slots)
+
+
+class PromptTemplate:
+    """
+    A prompt parsed once into literal and placeholder segments.
+
+    Args:
+        source: Prompt text with {variable} placeholders
+        required: Names of inputs that must be provided when rendering
+    """
+
+    def __init__(self, source: str, required: FrozenSet[str] = frozenset()):
+        self.source = source
+        self._parts, self._slots = _parse(source)
+        self.variables: FrozenSet[str] = frozenset(name for _, name in self._slots)
+        self.required = frozenset(required)
+
+    def validate(self) -> None:
+        """
+        Check that every required input is used in the prompt.
+
+        Raises:
+            ValidationError: If a required input has no placeholder
+        """
+        missing_vars = self.required - self.variables
+        if missing_vars:
+            raise ValidationError(
+                f"Required input variables {set(missing_vars)} are not used in the prompt template"
+            )
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """
+        Render the prompt with the given values.
+
+        Raises:
+            ValidationError: If required variables are missing or a placeholder has no value
+        """
+        missing_vars = self.required - values.keys()
+        if missing_vars:
+            raise ValidationError(f"Missing required variables: {set(missing_vars)}")
+
+        parts = list(self._parts)
+        for index, name in self._slots:
+            try:
+                value = values[name]
+            except KeyError as e:
+                raise ValidationError(f"Invalid variable in prompt template: {e}")
+            parts[index] = value if isinstance(value, str) else format(value)
+        return "".join(parts)
+
+
+class CompiledFlow(Flow):
+    """
+    Flow that keeps a PromptTemplate compiled from its prompt and inputs.
+
+    The template is rebuilt when the flow loads and whenever set_prompt,
+    add_input or remove_input change it; assign through those methods rather
+    than mutating ``prompt`` or ``inputs`` directly.
+
+    Examples:
+        >>> flow = CompiledFlow(source="flow.yaml")
+        >>> flow.render_prompt(mood="Happy", genre="Pop")
+    """
+
+    def __init__(self, name: Optional[str] = None, source: Union[str, Dict[str, Any], Path, None] = None):
+        # Older mira_sdk releases take (name=None, source=None), newer ones only source
+        if name is None:
+            super().__init__(source=source)
+        else:
+            super().__init__(name=name, source=source)
+        self.compile()
+
+    def _load_from_source(self, source: Union[str, Dict[str, Any], Path]) -> None:
+        with metrics.phase("flow_load"):
+            super()._load_from_source(source)
+
+    def compile(self) -> PromptTemplate:
+        required = frozenset(name for name, spec in self.inputs.items() if spec.required)
+        self.template = PromptTemplate(self.prompt, required)
+        return self.template
+
+    def set_prompt(self, prompt: str) -> 'CompiledFlow':
+        super().set_prompt(prompt)
+        self.compile()
+        return self
+
+    def add_input(self, *args, **kwargs) -> 'CompiledFlow':
+        super().add_input(*args, **kwargs)
+        self.compile()
+        return self
+
+    def remove_input(self, name: str) -> 'CompiledFlow':
+        super().remove_input(name)
+        self.compile()
+        return self
+
+    def validate_prompt_variables(self) -> None:
+        """Equivalent of ``utils.validation.validate_prompt_variables`` on the compiled template."""
+        self.template.validate()
+
+    def validate(self) -> bool:
+        """
+        ``Flow.validate`` with the prompt variable check done on the compiled template.
+
+        Raises:
+            ValidationError: If validation fails
+        """
+        # Newer SDKs validate while loading, before __init__ has compiled the template
+        template = self.template if hasattr(self, "template") else self.compile()
+        try:
+            template.validate()
+            if not self.metadata.name:
+                raise ValidationError("Flow name is required")
+            if not self.prompt:
+                raise ValidationError("Prompt template is required")
+            return True
+        except Exception as e:
+            raise ValidationError(f"Flow validation failed: {str(e)}")
+
+    def render_prompt(self, **kwargs: Any) -> str:
+        with metrics.phase("render"):
+            return self.template.render(kwargs)
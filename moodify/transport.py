@@ -0,0 +1,247 @@
+"""
+Keep-alive connection pooling for the Mira console clients.
+
+mira_sdk's Console calls the module-level ``requests.request``, so every flow
+run pays a new TCP+TLS handshake. The classes here keep the SDK's
+request/response behaviour but route calls through one long-lived,
+configurable connection pool. The asyncio counterpart lives in
+``moodify.async_transport``.
+
+Unlike the SDK, failed calls raise the typed errors in ``moodify.exceptions``
+instead of logging and returning None. Pass a ``moodify.resilience.Resilience``
+to add deadlines, retries, hedging and circuit breaking.
+"""
+import json
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from mira_sdk import MiraClient
+from mira_sdk.mira.client.console import Console
+from mira_sdk.mira.client.mira_client import FlowOperations, KnowledgeOperations
+
+from . import metrics
+from .exceptions import DeadlineExceeded, HTTPStatusError, ResponseDecodeError, TransportError, TransportTimeout
+from .resilience import Resilience, attempt_timeout, deadline, remaining
+
+if TYPE_CHECKING:
+    from .upload import MultipartBody
+
+# Set when a flow call starts building its request body; _request reports the elapsed time as "encode"
+_body_started: ContextVar[float] = ContextVar("moodify_body_started", default=0.0)
+# Set while a flow run carries a composio_config, whose tool calls must not be repeated
+_side_effects: ContextVar[bool] = ContextVar("moodify_side_effects", default=False)
+
+RUN_FLOW_PATH = "v1/flows/flows/run"
+
+
+@dataclass
+class PoolConfig:
+    """
+    Connection pool settings shared by the sync and async consoles.
+
+    Args:
+        pool_connections: Number of per-host pools kept by the sync adapter
+        pool_maxsize: Total connections the async connector keeps across all hosts
+        per_host_limit: Connections allowed to a single host at once
+        keepalive_timeout: Seconds an idle async connection is kept open
+        dns_cache_ttl: Seconds resolved addresses are cached by the async connector
+    """
+    pool_connections: int = 4
+    pool_maxsize: int = 32
+    per_host_limit: int = 16
+    keepalive_timeout: float = 30.0
+    dns_cache_ttl: int = 300
+
+
+def _error_detail_sync(response):
+    if response.headers.get('content-type') == 'application/json':
+        try:
+            return response.json()
+        except ValueError:
+            # A malformed error body must still surface as HTTPStatusError
+            pass
+    return response.text
+
+
+def _retry_after(headers) -> Optional[float]:
+    # Only the delta-seconds form; HTTP-date values fall back to normal backoff
+    try:
+        return max(0.0, float(headers.get("Retry-After")))
+    except (TypeError, ValueError):
+        return None
+
+
+def _retry_safe(method: str, path: str, files, side_effects: bool = False) -> bool:
+    """
+    Whether a call may be repeated (retried or hedged).
+
+    Only GETs and flow runs without files or composio tools qualify:
+    execute_flow, deploys, uploads and composio runs can act twice.
+    """
+    method = method.lower()
+    if method == "get":
+        return True
+    return method == "post" and path == RUN_FLOW_PATH and not files and not side_effects
+
+
+def _timeout_error(e: BaseException) -> Exception:
+    left = remaining()
+    if left is not None and left <= 0:
+        return DeadlineExceeded(f"Deadline exceeded: {e}")
+    return TransportTimeout(f"Request timed out: {e}")
+
+
+class PooledConsole(Console):
+    """
+    Console that reuses keep-alive connections through a shared requests.Session.
+
+    Args:
+        api_key: Mira API key
+        pool_config: Connection pool settings
+        resilience: Optional deadline/retry/hedging/circuit breaker policy
+    """
+
+    def __init__(self, api_key, pool_config: PoolConfig = None, resilience: Optional[Resilience] = None):
+        super().__init__(api_key)
+        self.pool_config = pool_config or PoolConfig()
+        self.resilience = resilience
+        self.session = requests.Session()
+        self.session.headers["MiraAuthorization"] = f"{self.api_key}"
+        # urllib3 only resolves DNS when it opens a connection, so keeping
+        # connections alive is what avoids repeated lookups on this path.
+        adapter = HTTPAdapter(
+            pool_connections=self.pool_config.pool_connections,
+            pool_maxsize=self.pool_config.per_host_limit,
+        )
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def run_flow(self, flow_config, input_dict, composio_config):
+        _body_started.set(time.perf_counter())
+        token = _side_effects.set(composio_config is not None)
+        try:
+            return super().run_flow(flow_config, input_dict, composio_config)
+        finally:
+            _side_effects.reset(token)
+
+    def execute_flow(self, author_name, flow_name, input_dict, version, flow_type, composio_config):
+        _body_started.set(time.perf_counter())
+        return super().execute_flow(author_name, flow_name, input_dict, version, flow_type, composio_config)
+
+    def add_knowledge_from_file(self, file_path, author_name, knowledge_name):
+        # Imported here to keep the upload engine off the playlist start-up path
+        from .upload import MultipartBody
+
+        # Streams the file instead of building the multipart body in memory, and always closes it
+        body = MultipartBody(file_path, {'author_name': author_name, 'name': knowledge_name})
+        try:
+            return self.upload_multipart("v1/knowledge/upload/", body)
+        finally:
+            body.close()
+
+    def upload_multipart(self, path, body: "MultipartBody"):
+        """POST a streaming MultipartBody. Uploads are never retried or hedged."""
+        return self._request(method="post", path=path, data=body, headers={"Content-Type": body.content_type})
+
+    def _request(self, method, path, query_params=None, json_data=None, files=None, data=None, headers=None):
+        """
+        Send one API call and return the decoded JSON response.
+
+        Raises:
+            HTTPStatusError: On a non-200 response
+            TransportError: If no response arrived (TransportTimeout for timeouts)
+            ResponseDecodeError: If a 200 response is not valid JSON
+            DeadlineExceeded: If the call deadline expired
+            CircuitOpenError: If the circuit breaker is open
+        """
+        url = f"{self.base_url}/{path}"
+        retry_safe = _retry_safe(method, path, files, _side_effects.get())
+        body_started = _body_started.get()
+        _body_started.set(0.0)
+        if json_data is not None:
+            # Encode here rather than inside requests so the cost lands in "encode", not "network"
+            encode_started = body_started or time.perf_counter()
+            data = json.dumps(json_data, allow_nan=False).encode("utf-8")
+            headers = {**(headers or {}), "Content-Type": "application/json"}
+            json_data = None
+            metrics.record("encode", time.perf_counter() - encode_started)
+        elif body_started:
+            metrics.record("encode", time.perf_counter() - body_started)
+
+        def send(timeout):
+            try:
+                with metrics.phase("network"):
+                    response = self.session.request(
+                        method,
+                        url,
+                        params=query_params,
+                        json=json_data,
+                        data=data,
+                        files=files,
+                        headers=headers,
+                        timeout=timeout
+                    )
+            except requests.exceptions.Timeout as e:
+                raise _timeout_error(e) from e
+            except requests.exceptions.RequestException as e:
+                raise TransportError(f"An error occurred: {e}") from e
+            if response.status_code != 200:
+                raise HTTPStatusError(
+                    response.status_code, _error_detail_sync(response), _retry_after(response.headers)
+                )
+            try:
+                with metrics.phase("decode"):
+                    return response.json()
+            except ValueError as e:
+                raise ResponseDecodeError(f"Response is not valid JSON: {e}") from e
+
+        if self.resilience is None:
+            return send(attempt_timeout())
+        return self.resilience.call(send, retry_safe)
+
+    def close(self):
+        self.session.close()
+        if self.resilience is not None:
+            self.resilience.close()
+
+
+class DeadlineFlowOperations(FlowOperations):
+    """FlowOperations whose test and execute accept a per-call ``timeout`` in seconds."""
+
+    def test(self, flow, input_dict: dict, composio_config=None, timeout: Optional[float] = None):
+        with deadline(timeout):
+            return super().test(flow, input_dict, composio_config)
+
+    def execute(self, flow_name: str, input_dict: dict, composio_config=None, timeout: Optional[float] = None):
+        with deadline(timeout):
+            return super().execute(flow_name, input_dict, composio_config)
+
+
+class PooledMiraClient(MiraClient):
+    """
+    MiraClient backed by a PooledConsole.
+
+    Examples:
+        >>> with PooledMiraClient(config={"API_KEY": key}, resilience=Resilience()) as client:
+        ...     client.flow.test(flow, input_data, timeout=30)
+    """
+
+    def __init__(self, config=None, pool_config: PoolConfig = None, resilience: Optional[Resilience] = None):
+        super().__init__(config)
+        self._console = PooledConsole(self._config.get("API_KEY"), pool_config, resilience)
+        self.flow = DeadlineFlowOperations(self._console)
+        self.dataset = KnowledgeOperations(self._console)
+
+    def close(self):
+        self._console.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -0,0 +1,326 @@
+"""
+Bounded-memory streaming uploads for knowledge sources.
+
+mira_sdk's ``Console.add_knowledge_from_file`` hands an unclosed file handle
+to ``requests``, which builds the whole multipart body in memory: a 200 MB
+catalog CSV costs several hundred MB of RSS. MultipartBody instead streams
+the file through one reused fixed-size buffer with a known Content-Length,
+and closes the file as soon as the body is finished or abandoned.
+
+The knowledge API takes each source as a single multipart file, so a file is
+not split across requests. Instead, files are divided into fixed-size parts
+that are hashed in parallel over an mmap of the file. The part checksums
+identify content that was already uploaded, so a re-run of an interrupted
+batch skips it. They are also recomputed while streaming, so a file that
+changes mid-upload is detected and never recorded as done.
+"""
+import hashlib
+import json
+import mmap
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from mira_sdk.mira.utils.util import split_name
+
+from .batch import BatchResult
+
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+DEFAULT_PART_SIZE = 8 * 1024 * 1024
+MAX_SOURCE_SIZE = 200 * 1024 * 1024  # 200MB, the limit enforced by KnowledgeOperations.add_source
+ALLOWED_TYPES = ('.csv', '.txt', '.pdf', '.md')
+
+ProgressCallback = Callable[[str, int, int], None]
+
+
+@dataclass(frozen=True)
+class Part:
+    index: int
+    offset: int
+    length: int
+
+
+def plan_parts(size: int, part_size: int = DEFAULT_PART_SIZE) -> List[Part]:
+    """Split ``size`` bytes into consecutive parts of ``part_size`` bytes (the last may be shorter)."""
+    if part_size <= 0:
+        raise ValueError("part_size must be positive")
+    return [
+        Part(index, offset, min(part_size, size - offset))
+        for index, offset in enumerate(range(0, size, part_size))
+    ]
+
+
+def validate_source(file_path: str) -> None:
+    """Apply the checks of ``KnowledgeOperations.add_source`` to a local file."""
+    if not os.path.exists(file_path):
+        raise FileNotFoundError(f"The file {file_path} does not exist.")
+
+    if not os.access(file_path, os.R_OK):
+        raise PermissionError(f"The file {file_path} is not readable.")
+
+    if os.path.getsize(file_path) > MAX_SOURCE_SIZE:
+        raise ValueError(f"The file {file_path} exceeds the maximum allowed size of 200MB.")
+
+    file_extension = os.path.splitext(file_path)[1].lower()
+    if file_extension not in ALLOWED_TYPES:
+        raise ValueError(f"Unsupported file type. Allowed types are: {', '.join(ALLOWED_TYPES)}")
+
+
+def part_checksums(
+        file_path: str,
+        part_size: int = DEFAULT_PART_SIZE,
+        executor: Optional[ThreadPoolExecutor] = None
+) -> List[str]:
+    """
+    Return the sha256 of each part of a file.
+
+    Parts are hashed straight from an mmap of the file, in parallel when an
+    executor is given (hashlib releases the GIL on large buffers). Each
+    part's pages are dropped from the mapping once hashed, so resident
+    memory does not grow with the file.
+
+    Raises:
+        ValueError: If ``part_size`` is not a multiple of the mmap allocation granularity
+    """
+    if part_size % mmap.ALLOCATIONGRANULARITY:
+        raise ValueError(f"part_size must be a positive multiple of {mmap.ALLOCATIONGRANULARITY}")
+    parts = plan_parts(os.path.getsize(file_path), part_size)
+    if not parts:
+        return []
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        def digest(part: Part) -> str:
+            with memoryview(mapped) as whole, whole[part.offset:part.offset + part.length] as view:
+                checksum = hashlib.sha256(view).hexdigest()
+            if hasattr(mapped, "madvise"):
+                mapped.madvise(mmap.MADV_DONTNEED, part.offset, part.length)
+            return checksum
+
+        if executor is None:
+            return [digest(part) for part in parts]
+        return list(executor.map(digest, parts))
+
+
+def _quote(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', "%22").replace("\r", "%0D").replace("\n", "%0A")
+
+
+class MultipartBody:
+    """
+    multipart/form-data request body that streams one file in fixed-size chunks.
+
+    ``requests`` sends it with a Content-Length taken from ``len()`` and
+    pulls it chunk by chunk, so memory use is one ``chunk_size`` buffer
+    whatever the file size. The file is opened when iteration starts and
+    closed when the body is exhausted or ``close()`` is called.
+
+    Args:
+        file_path: File to send
+        fields: Plain form fields sent before the file
+        file_field: Form field name of the file
+        chunk_size: Read/send buffer size in bytes
+        part_size: Size of the parts whose checksums are collected in ``part_checksums``
+        progress: Optional ``progress(file_path, sent_bytes, total_bytes)`` callback
+    """
+
+    def __init__(
+            self,
+            file_path: str,
+            fields: Dict[str, str],
+            file_field: str = "file",
+            chunk_size: int = DEFAULT_CHUNK_SIZE,
+            part_size: int = DEFAULT_PART_SIZE,
+            progress: Optional[ProgressCallback] = None
+    ):
+        self.file_path = file_path
+        self.size = os.path.getsize(file_path)
+        self.chunk_size = chunk_size
+        self.parts = plan_parts(self.size, part_size)
+        self.progress = progress
+        self.part_checksums: List[str] = []
+        boundary = uuid.uuid4().hex
+        self.content_type = f"multipart/form-data; boundary={boundary}"
+
+        head = []
+        for name, value in fields.items():
+            head.append(
+                f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote(name)}"\r\n\r\n{value}\r\n'
+            )
+        head.append(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{_quote(file_field)}"; '
+            f'filename="{_quote(os.path.basename(file_path))}"\r\n\r\n'
+        )
+        self._head = "".join(head).encode()
+        self._tail = f"\r\n--{boundary}--\r\n".encode()
+        self._chunks = None
+
+    def __len__(self) -> int:
+        return len(self._head) + self.size + len(self._tail)
+
+    def __iter__(self) -> Iterator[bytes]:
+        self.close()
+        self._chunks = self._generate()
+        return self._chunks
+
+    def _generate(self) -> Iterator[bytes]:
+        self.part_checksums = []
+        yield self._head
+        buffer = memoryview(bytearray(self.chunk_size))
+        sent = 0
+        with open(self.file_path, "rb", buffering=0) as f:
+            for part in self.parts:
+                part_hash = hashlib.sha256()
+                part_end = part.offset + part.length
+                while sent < part_end:
+                    read = f.readinto(buffer[:min(self.chunk_size, part_end - sent)])
+                    if not read:
+                        raise IOError(f"The file {self.file_path} was truncated during upload.")
+                    chunk = buffer[:read]
+                    part_hash.update(chunk)
+                    # The consumer sends each chunk before asking for the next, so the buffer can be reused
+                    yield chunk
+                    sent += read
+                    if self.progress is not None:
+                        self.progress(self.file_path, sent, self.size)
+                self.part_checksums.append(part_hash.hexdigest())
+        yield self._tail
+
+    def close(self) -> None:
+        """Close the file if an iteration was abandoned part way."""
+        if self._chunks is not None:
+            self._chunks.close()
+            self._chunks = None
+
+
+class KnowledgeUploader:
+    """
+    Upload knowledge source files with bounded memory, several at a time.
+
+    Completed uploads are recorded in ``state_dir`` under a hash of the
+    dataset and the file's part checksums. Re-running a batch after a
+    failure skips files whose content was already uploaded to that dataset.
+
+    Args:
+        console: PooledConsole used for the upload calls
+        concurrency: Files uploaded at once; peak memory is about ``concurrency * chunk_size``
+        part_size: Size of the checksummed parts
+        state_dir: Directory for upload records; None disables resume
+        progress: Optional ``progress(file_path, sent_bytes, total_bytes)`` callback
+
+    Examples:
+        >>> uploader = KnowledgeUploader(client._console, state_dir=".cache/uploads")
+        >>> for item in uploader.upload_many("@me/moods", glob.glob("catalog/*.csv")):
+        ...     print(item.input, "ok" if item.ok else item.error)
+    """
+
+    def __init__(
+            self,
+            console,
+            concurrency: int = 4,
+            part_size: int = DEFAULT_PART_SIZE,
+            state_dir: Optional[str] = None,
+            progress: Optional[ProgressCallback] = None
+    ):
+        self.console = console
+        self.concurrency = concurrency
+        self.part_size = part_size
+        self.state_dir = state_dir
+        self.progress = progress
+        self._hash_executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="moodify-hash")
+
+    def _record_path(self, dataset_name: str, checksums: List[str]) -> Optional[str]:
+        if not self.state_dir:
+            return None
+        digest = hashlib.sha256(f"{dataset_name}\0{self.part_size}\0{','.join(checksums)}".encode()).hexdigest()
+        return os.path.join(self.state_dir, f"{digest}.json")
+
+    def _load_record(self, path: Optional[str]) -> Optional[Dict[str, Any]]:
+        if path is None:
+            return None
+        try:
+            with open(path, "r") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _save_record(self, path: Optional[str], record: Dict[str, Any]) -> None:
+        if path is None:
+            return
+        try:
+            os.makedirs(self.state_dir, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.state_dir, suffix=".tmp")
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, "w") as f:
+                json.dump(record, f, default=str)
+            os.replace(tmp_path, path)
+        except (OSError, TypeError, ValueError):
+            try:
+                os.remove(tmp_path)
+            except OSError:
+                pass
+
+    def upload(self, dataset_name: str, file_path: str):
+        """
+        Upload one file to a dataset given as ``author/name``, unless it was already uploaded.
+
+        Raises:
+            FileNotFoundError, PermissionError, ValueError: As KnowledgeOperations.add_source
+            IOError: If the file changed while it was being uploaded
+        """
+        validate_source(file_path)
+        org, name = split_name(dataset_name)
+        checksums = part_checksums(file_path, self.part_size, self._hash_executor)
+        record_path = self._record_path(dataset_name, checksums)
+        record = self._load_record(record_path)
+        if record is not None:
+            if self.progress is not None:
+                size = os.path.getsize(file_path)
+                self.progress(file_path, size, size)
+            return record["response"]
+
+        body = MultipartBody(
+            file_path,
+            {"author_name": org, "name": name},
+            part_size=self.part_size,
+            progress=self.progress,
+        )
+        try:
+            response = self.console.upload_multipart("v1/knowledge/upload/", body)
+        finally:
+            body.close()
+        if body.part_checksums != checksums:
+            raise IOError(f"The file {file_path} changed during upload.")
+        self._save_record(record_path, {
+            "dataset": dataset_name,
+            "file": os.path.abspath(file_path),
+            "size": body.size,
+            "part_size": self.part_size,
+            "parts": checksums,
+            "response": response,
+        })
+        return response
+
+    def upload_many(self, dataset_name: str, file_paths: Iterable[str]) -> Iterator[BatchResult]:
+        """Upload files concurrently, yielding a BatchResult per file in completion order."""
+        with ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="moodify-upload") as executor:
+            futures = {
+                executor.submit(self.upload, dataset_name, file_path): (index, file_path)
+                for index, file_path in enumerate(file_paths)
+            }
+            for future in as_completed(futures):
+                index, file_path = futures[future]
+                error = future.exception()
+                yield BatchResult(index, file_path, None if error else future.result(), error)
+
+    def close(self) -> None:
+        self._hash_executor.shutdown(wait=False)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
@@ -1,16 +1,12 @@
 import { NextApiRequest, NextApiResponse } from 'next';
-import { spawn } from 'child_process';
 import path from 'path';
+import { PythonWorkerPool } from '../../lib/python-worker-pool';
 
-export default async function handler(req: NextApiRequest, res: NextApiResponse) {
-  if (req.method !== 'POST') {
-    return res.status(405).json({ error: 'Method not allowed' });
-  }
-
-  try {
-    const inputData = req.body;
-    console.log('Received input data:', inputData);
+// Keep the pool on globalThis so dev-mode hot reloads do not leak Python workers
+const globalForPool = globalThis as unknown as { moodifyWorkerPool?: PythonWorkerPool };
 
+function getWorkerPool() {
+  if (!globalForPool.moodifyWorkerPool) {
     // Use the virtual environment Python
     const pythonPath = path.join(process.cwd(), '..', 'building-your-own-flows', 'venv', 'bin', 'python');
     const scriptPath = path.join(process.cwd(), 'moodify-test-local.py');
@@ -18,56 +14,52 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     console.log('Python path:', pythonPath);
     console.log('Script path:', scriptPath);
 
-    const python = spawn(pythonPath, [
+    globalForPool.moodifyWorkerPool = new PythonWorkerPool({
+      pythonPath,
       scriptPath,
-      JSON.stringify(inputData)
-    ]);
-
-    let result = '';
-    let error = '';
-
-    python.stdout.on('data', (data) => {
-      console.log('Python stdout:', data.toString());
-      result += data.toString();
-    });
-
-    python.stderr.on('data', (data) => {
-      console.error('Python stderr:', data.toString());
-      error += data.toString();
+      size: Number(process.env.MOODIFY_POOL_SIZE ?? 2),
+      maxRequestsPerWorker: Number(process.env.MOODIFY_WORKER_MAX_REQUESTS ?? 500),
+      workerConcurrency: Number(process.env.MOODIFY_WORKER_CONCURRENCY ?? 8),
     });
+  }
+  return globalForPool.moodifyWorkerPool;
+}
 
-    await new Promise((resolve, reject) => {
-      python.on('close', (code) => {
-        console.log('Python process exited with code:', code);
-        if (code !== 0) {
-          reject(new Error(`Process exited with code ${code}: ${error}`));
-        } else {
-          resolve(result);
-        }
-      });
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== 'POST') {
+    return res.status(405).json({ error: 'Method not allowed' });
+  }
 
-      // Add error handler for spawn
-      python.on('error', (err) => {
-        console.error('Failed to start Python process:', err);
-        reject(new Error(`Failed to start Python process: ${err.message}`));
-      });
-    });
+  try {
+    const inputData = req.body;
+    console.log('Received input data:', inputData);
 
-    try {
-      const parsedResult = JSON.parse(result);
-      return res.status(200).json({ result: parsedResult });
-    } catch (parseError) {
-      console.error('Failed to parse Python output:', result);
-      return res.status(500).json({
-        error: 'Invalid output from Python script',
-        details: result
-      });
+    // NDJSON streaming: one {"type":"track"} line per track as soon as it is generated
+    const wantsStream = req.query.stream === '1' || (req.headers.accept ?? '').includes('application/x-ndjson');
+    if (wantsStream) {
+      res.status(200);
+      res.setHeader('Content-Type', 'application/x-ndjson; charset=utf-8');
+      res.setHeader('Cache-Control', 'no-cache');
+      try {
+        const summary = await getWorkerPool().run(inputData, (track) => {
+          res.write(JSON.stringify({ type: 'track', track }) + '\n');
+        });
+        res.write(JSON.stringify({ type: 'done', ...summary }) + '\n');
+      } catch (error) {
+        console.error('Error:', error);
+        const details = error instanceof Error ? error.message : String(error);
+        res.write(JSON.stringify({ type: 'error', error: 'Failed to generate playlist', details }) + '\n');
+      }
+      return res.end();
     }
+
+    const result = await getWorkerPool().run(inputData);
+    return res.status(200).json({ result });
   } catch (error) {
     console.error('Error:', error);
     return res.status(500).json({
       error: 'Failed to generate playlist',
-      details: error.message
+      details: error instanceof Error ? error.message : String(error)
     });
   }
 }
@@ -0,0 +1,9 @@
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FLOW_PATH = os.path.join(ROOT, "flow.yaml")
+
+sys.path.insert(0, ROOT)
+# The fault-injecting StubServer lives with the benchmarks
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
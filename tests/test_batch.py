@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+import pytest
+
+from moodify.batch import TokenBucket, run_many
+
+
+async def collect(batch):
+    return [item async for item in batch]
+
+
+def test_concurrency_is_capped():
+    running = 0
+    peak = 0
+
+    async def fn(item):
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+        return item
+
+    results = asyncio.run(collect(run_many(fn, range(20), concurrency=3)))
+    assert len(results) == 20
+    assert peak == 3
+
+
+def test_results_are_tagged_in_completion_order():
+    async def fn(delay):
+        await asyncio.sleep(delay)
+        return delay * 10
+
+    results = asyncio.run(collect(run_many(fn, [0.06, 0.0, 0.03], concurrency=3)))
+    assert [(r.index, r.input, r.result) for r in results] == [(1, 0.0, 0.0), (2, 0.03, 0.3), (0, 0.06, 0.6)]
+
+
+def test_failures_stay_with_their_item():
+    async def fn(item):
+        if item == 2:
+            raise ValueError("bad input")
+        return item
+
+    results = sorted(asyncio.run(collect(run_many(fn, range(4)))), key=lambda r: r.index)
+    assert [r.ok for r in results] == [True, True, False, True]
+    assert isinstance(results[2].error, ValueError)
+    assert [r.result for r in results if r.ok] == [0, 1, 3]
+
+
+def test_rate_limit_spaces_out_starts():
+    starts = []
+
+    async def fn(item):
+        starts.append(time.monotonic())
+        return item
+
+    asyncio.run(collect(run_many(fn, range(5), concurrency=5, rate_limit=20, burst=1)))
+    # One token up front, then one every 50ms
+    assert starts[-1] - starts[0] >= 0.18
+
+
+def test_token_bucket_rejects_non_positive_rate():
+    with pytest.raises(ValueError):
+        TokenBucket(0)
+
+
+def test_early_close_cancels_in_flight_calls():
+    cancelled = []
+
+    async def fn(item):
+        try:
+            await asyncio.sleep(0 if item == 0 else 10)
+        except asyncio.CancelledError:
+            cancelled.append(item)
+            raise
+        return item
+
+    async def scenario():
+        batch = run_many(fn, range(10), concurrency=4)
+        first = await batch.__anext__()
+        await batch.aclose()
+        return first
+
+    started = time.monotonic()
+    assert asyncio.run(scenario()).index == 0
+    assert time.monotonic() - started < 1
+    # Item 4 is only started when the consumer asks for the next result
+    assert sorted(cancelled) == [1, 2, 3]
+
+
+def test_async_iterator_inputs_are_consumed_lazily():
+    pulled = []
+
+    async def inputs():
+        for item in range(100):
+            pulled.append(item)
+            yield item
+
+    async def fn(item):
+        return item * 2
+
+    async def scenario():
+        batch = run_many(fn, inputs(), concurrency=2)
+        first = [await batch.__anext__() for _ in range(2)]
+        await batch.aclose()
+        return first
+
+    first = asyncio.run(scenario())
+    assert sorted(r.result for r in first) == [0, 2]
+    assert len(pulled) <= 4
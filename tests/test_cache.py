@@ -0,0 +1,72 @@
+import threading
+import time
+
+from mira_sdk import Flow
+
+from conftest import FLOW_PATH
+from moodify.cache import BandingCanonicalizer, CachedFlowOperations, LRUCache
+
+
+def test_banding_groups_nearby_values():
+    canonical = BandingCanonicalizer()
+    assert canonical({"energy": 71}) == canonical({"energy": 78})
+    assert canonical({"energy": 69}) != canonical({"energy": 70})
+
+
+def test_banding_puts_100_in_top_band():
+    canonical = BandingCanonicalizer()
+    assert canonical({"energy": 100}) == canonical({"energy": 90})
+    assert canonical({"energy": 0}) == canonical({"energy": 9})
+
+
+def test_banding_normalises_strings():
+    canonical = BandingCanonicalizer()
+    assert canonical({"mood": "  Happy "}) == canonical({"mood": "happy"})
+
+
+class UpstreamOperations:
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.calls = 0
+
+    def test(self, flow, input_dict, composio_config=None):
+        self.calls += 1
+        time.sleep(self.latency)
+        return {"result": f"playlist {self.calls}"}
+
+
+def test_configured_memory_tier_is_kept():
+    memory = LRUCache(maxsize=5, ttl=10)
+    operations = CachedFlowOperations(UpstreamOperations(), memory=memory)
+    assert operations.memory is memory
+    assert (operations.memory.maxsize, operations.memory.ttl) == (5, 10)
+
+
+def test_late_miss_does_not_call_upstream_again():
+    late_caller = threading.Event()
+
+    class PausingCache(LRUCache):
+        def get(self, key):
+            value = super().get(key)
+            if late_caller.is_set() and threading.current_thread().name == "late":
+                # Miss now, return after the leader has stored its result
+                late_caller.clear()
+                time.sleep(0.3)
+            return value
+
+    upstream = UpstreamOperations(latency=0.1)
+    operations = CachedFlowOperations(upstream, memory=PausingCache())
+    flow = Flow(source=FLOW_PATH)
+    inputs = {"mood": "Happy", "energy_level": 72}
+    results = []
+    late_caller.set()
+    threads = [
+        threading.Thread(target=lambda: results.append(operations.test(flow, inputs)), name=name)
+        for name in ("leader", "late")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert upstream.calls == 1
+    assert results == [{"result": "playlist 1"}] * 2
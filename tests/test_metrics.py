@@ -0,0 +1,30 @@
+import json
+
+from stub_server import StubServer
+
+from moodify import metrics
+from moodify.transport import PooledConsole
+
+FLOW_CONFIG = {"version": "1.0.0", "prompt": "x" * 10_000}
+
+
+def test_flow_run_records_encode_network_and_decode():
+    stub = StubServer(body={"result": "ok"}).start()
+    console = PooledConsole("test")
+    console.base_url = stub.url
+    try:
+        with metrics.trace() as trace:
+            assert console.run_flow(FLOW_CONFIG, {"mood": "Happy"}, None) == {"result": "ok"}
+    finally:
+        console.close()
+        stub.stop()
+    assert set(trace.phases) == {"encode", "network", "decode"}
+    assert trace.phases["encode"] > 0
+
+
+def test_render_is_openmetrics():
+    metrics.record("render", 0.002)
+    text = metrics.render()
+    assert 'moodify_phase_seconds_bucket{le="0.0025",phase="render"}' in text
+    assert text.endswith("# EOF\n")
+    json.dumps(metrics.Trace("id").as_dict())
@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from mira_sdk import Flow
+from stub_server import StubServer
+
+from conftest import FLOW_PATH
+from moodify import metrics
+from moodify.async_transport import PooledAsyncConsole
+from moodify.cache import CachedFlowOperations
+from moodify.exceptions import CircuitOpenError, DeadlineExceeded, HTTPStatusError, ResponseDecodeError
+from moodify.resilience import CircuitBreaker, HedgePolicy, Resilience, RetryPolicy, deadline
+from moodify.transport import PooledConsole, PooledMiraClient
+
+FLOW_CONFIG = {"prompt": "Make a {mood} playlist"}
+INPUT = {"mood": "Happy", "energy_level": 72}
+
+
+class Tools:
+    """Stand-in for a ComposioConfig; the console only calls dict()."""
+
+    def dict(self):
+        return {"action": "SPOTIFY_CREATE_PLAYLIST"}
+
+
+@pytest.fixture
+def stub():
+    server = StubServer(slow_latency=1.0).start()
+    yield server
+    server.stop()
+
+
+def make_console(stub, **policy):
+    policy.setdefault("retry", RetryPolicy(base_delay=0.01, max_delay=0.05))
+    console = PooledConsole("test", resilience=Resilience(**policy))
+    console.base_url = stub.url
+    return console
+
+
+def test_retries_503(stub):
+    stub.script = ["error"]
+    console = make_console(stub)
+    assert console.run_flow(FLOW_CONFIG, INPUT, None)["result"]
+    assert stub.requests == 2
+
+
+def test_retries_dropped_connection(stub):
+    stub.script = ["drop"]
+    console = make_console(stub)
+    assert console.run_flow(FLOW_CONFIG, INPUT, None)["result"]
+    assert stub.requests == 2
+
+
+def test_retries_non_json_reply(stub):
+    stub.script = ["garbage"]
+    console = make_console(stub)
+    assert console.run_flow(FLOW_CONFIG, INPUT, None)["result"]
+    stub.script = ["garbage"]
+    with pytest.raises(ResponseDecodeError):
+        make_console(stub, retry=None).run_flow(FLOW_CONFIG, INPUT, None)
+
+
+def test_malformed_error_body_is_still_a_status_error(stub):
+    stub.script = ["bad_error"]
+    assert make_console(stub).run_flow(FLOW_CONFIG, INPUT, None)["result"]
+    stub.script = ["bad_error"]
+    with pytest.raises(HTTPStatusError) as raised:
+        make_console(stub, retry=None).run_flow(FLOW_CONFIG, INPUT, None)
+    assert (raised.value.status, raised.value.detail) == (503, '{"detail": "inj')
+
+
+def test_does_not_repeat_calls_with_side_effects(stub, tmp_path):
+    console = make_console(stub)
+    path = tmp_path / "catalog.csv"
+    path.write_text("id,title\n1,Song\n")
+    stub.script = ["error"]
+    with pytest.raises(HTTPStatusError):
+        console.add_knowledge_from_file(str(path), "me", "moods")
+    stub.script = ["error"]
+    with pytest.raises(HTTPStatusError):
+        console.execute_flow("me", "playlist", INPUT, None, "PRIMITIVE", None)
+    stub.script = ["error"]
+    with pytest.raises(HTTPStatusError):
+        console.run_flow(FLOW_CONFIG, INPUT, Tools())
+    assert stub.requests == 3
+
+
+def test_flow_test_timeout_bounds_the_call():
+    stub = StubServer(latency=1.0).start()
+    client = PooledMiraClient(config={"API_KEY": "test"}, resilience=Resilience())
+    client._console.base_url = stub.url
+    try:
+        started = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            client.flow.test(Flow(source=FLOW_PATH), INPUT, timeout=0.2)
+        assert time.perf_counter() - started < 0.8
+    finally:
+        client.close()
+        stub.stop()
+
+
+def test_single_flight_follower_honours_its_deadline():
+    stub = StubServer(latency=1.0).start()
+    client = PooledMiraClient(config={"API_KEY": "test"}, resilience=Resilience())
+    client._console.base_url = stub.url
+    flow = Flow(source=FLOW_PATH)
+    operations = CachedFlowOperations(client.flow)
+    leader = threading.Thread(target=operations.test, args=(flow, INPUT))
+    try:
+        leader.start()
+        time.sleep(0.1)
+        started = time.perf_counter()
+        with pytest.raises(DeadlineExceeded):
+            operations.test(flow, INPUT, timeout=0.2)
+        assert time.perf_counter() - started < 0.6
+        leader.join()
+        assert stub.requests == 1
+    finally:
+        client.close()
+        stub.stop()
+
+
+def test_hedges_slow_attempt(stub):
+    console = make_console(stub, hedge=HedgePolicy(min_samples=5, min_delay=0.05))
+    hedged = metrics.registry.counter("moodify_hedged_requests", "Hedged duplicate attempts")
+    for _ in range(5):
+        console.run_flow(FLOW_CONFIG, INPUT, None)
+    before = hedged.value
+    stub.script = ["slow"]
+    started = time.perf_counter()
+    assert console.run_flow(FLOW_CONFIG, INPUT, None)["result"]
+    assert time.perf_counter() - started < 0.5
+    assert hedged.value == before + 1
+    assert stub.requests == 7
+    console.close()
+
+
+def test_breaker_opens_then_probes_and_closes(stub):
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.2)
+    console = make_console(stub, retry=None, breaker=breaker)
+    stub.script = ["error", "error"]
+    for _ in range(2):
+        with pytest.raises(HTTPStatusError):
+            console.run_flow(FLOW_CONFIG, INPUT, None)
+    assert breaker.state == CircuitBreaker.OPEN
+    with pytest.raises(CircuitOpenError):
+        console.run_flow(FLOW_CONFIG, INPUT, None)
+    assert stub.requests == 2
+
+    time.sleep(0.25)
+    stub.script = ["garbage"]
+    with pytest.raises(ResponseDecodeError):
+        console.run_flow(FLOW_CONFIG, INPUT, None)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    time.sleep(0.25)
+    assert console.run_flow(FLOW_CONFIG, INPUT, None)["result"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_cancelled_probe_frees_half_open_breaker(stub):
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.0)
+    breaker.record_failure()
+    console = PooledAsyncConsole("test", resilience=Resilience(retry=None, breaker=breaker))
+    console.base_url = stub.url
+    stub.script = ["slow"]
+
+    async def scenario():
+        probe = asyncio.ensure_future(console.run_flow(FLOW_CONFIG, INPUT))
+        await asyncio.sleep(0.1)
+        probe.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await probe
+        result = await console.run_flow(FLOW_CONFIG, INPUT)
+        await console.close()
+        return result
+
+    assert asyncio.run(scenario())["result"]
+    assert breaker.state == CircuitBreaker.CLOSED
+
+
+def test_expired_deadline_does_not_count_against_backend(stub):
+    breaker = CircuitBreaker(failure_threshold=1)
+    console = make_console(stub, breaker=breaker)
+    with deadline(0):
+        with pytest.raises(DeadlineExceeded):
+            console.run_flow(FLOW_CONFIG, INPUT, None)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert stub.requests == 0
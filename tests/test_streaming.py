@@ -0,0 +1,86 @@
+import asyncio
+import json
+import time
+
+from stub_server import StubServer
+
+from moodify.async_transport import PooledAsyncMiraClient
+from moodify.streaming import JsonStringFieldDecoder, TrackParser
+
+FLOW_CONFIG = {"version": "1.0.0", "prompt": "{mood}"}
+# Escapes, a BMP character and an astral one (sent as a 🎵 surrogate pair)
+TEXT = '1. Café "Live"\\Tour, Album\t1, Artist \U0001F3B5\n2. Song, Album, Artist'
+
+
+def decode(chunks, field="result"):
+    decoder = JsonStringFieldDecoder(field)
+    return "".join(decoder.feed(chunk) for chunk in chunks) + decoder.close()
+
+
+def test_decoder_handles_every_split_point():
+    body = json.dumps({"id": 1, "result": TEXT, "tail": "x"})
+    assert "\\ud83c\\udfb5" in body
+    for split in range(len(body) + 1):
+        assert decode([body[:split], body[split:]]) == TEXT
+    assert decode(body) == TEXT
+
+
+def test_decoder_falls_back_on_close():
+    # Not JSON at all
+    assert decode(["<html>Bad ", "gateway</html>"]) == "<html>Bad gateway</html>"
+    # Field missing or not a string: recovered from the full body
+    assert decode([json.dumps({"output": "1. A, B, C"})]) == "1. A, B, C"
+    assert decode([json.dumps({"result": {"playlist": "1. A, B, C"}})]) == "1. A, B, C"
+    assert decode([json.dumps({"result": ["1. A, B, C"]})]) == '["1. A, B, C"]'
+
+
+def test_parser_drops_duplicates_and_keeps_positions():
+    parser = TrackParser()
+    tracks = parser.feed("1. Song, Album, Artist\n2. song , Other Album, ARTIST\n3. Next")
+    tracks += parser.feed(", Album, Artist\n")
+    tracks += parser.close()
+    assert [(t.position, t.title) for t in tracks] == [(1, "Song"), (2, "Next")]
+
+
+def test_parser_unwraps_json_array_lines_and_skips_preamble():
+    parser = TrackParser()
+    tracks = parser.feed(
+        "Here's a playlist for your happy, energetic, sunny mood:\n"
+        "[\n"
+        '  "1. Happy, G I R L, Pharrell Williams",\n'
+        '  "2. Walking on Sunshine, Walking on Sunshine, Katrina and the Waves"\n'
+        "]"
+    )
+    tracks += parser.close()
+    assert [(t.title, t.album, t.artist) for t in tracks] == [
+        ("Happy", "G I R L", "Pharrell Williams"),
+        ("Walking on Sunshine", "Walking on Sunshine", "Katrina and the Waves"),
+    ]
+
+
+def stream(stub):
+    async def scenario():
+        async with PooledAsyncMiraClient(config={"API_KEY": "test"}) as client:
+            client.console.base_url = stub.url
+            started = time.perf_counter()
+            arrivals = []
+            async for track in client.flow.stream(FLOW_CONFIG, {"mood": "Happy"}):
+                arrivals.append((time.perf_counter() - started, track))
+            return arrivals, time.perf_counter() - started
+
+    try:
+        return asyncio.run(scenario())
+    finally:
+        stub.stop()
+
+
+def test_stream_yields_tracks_before_the_body_completes():
+    playlist = "\n".join(f"{i + 1}. Song {i % 8}, Album, Artist" for i in range(10))
+    arrivals, total = stream(StubServer(body={"result": playlist}, chunk_delay=0.02).start())
+    assert [track.title for _, track in arrivals] == [f"Song {i}" for i in range(8)]
+    assert arrivals[0][0] < total / 2
+
+
+def test_stream_passes_non_json_replies_through():
+    arrivals, _ = stream(StubServer(body="1. Song, Album, Artist\n2. Other, Album, Artist", chunk_delay=0.01).start())
+    assert [track.title for _, track in arrivals] == ["Song", "Other"]
@@ -0,0 +1,29 @@
+from mira_sdk import Flow
+
+from conftest import FLOW_PATH
+from moodify.snapshot import load_flow
+from moodify.template import CompiledFlow
+
+
+def test_compiled_flow_loads_like_sdk_flow():
+    assert CompiledFlow(source=FLOW_PATH).to_dict() == Flow(source=FLOW_PATH).to_dict()
+
+
+def test_load_flow_matches_sdk_flow(tmp_path):
+    expected = Flow(source=FLOW_PATH).to_dict()
+    assert expected["prompt"]
+    assert load_flow(FLOW_PATH).to_dict() == expected
+    # Cold and warm snapshot reads build the same flow
+    assert load_flow(FLOW_PATH, snapshot_dir=str(tmp_path)).to_dict() == expected
+    assert load_flow(FLOW_PATH, snapshot_dir=str(tmp_path)).to_dict() == expected
+
+
+def test_render_prompt_uses_flow_prompt():
+    flow = load_flow(FLOW_PATH)
+    values = {name: "x" for name in flow.template.variables}
+    assert flow.render_prompt(**values) == flow.template.render(values)
+    assert flow.template.variables
+
+
+def test_validate_accepts_repo_flow():
+    assert load_flow(FLOW_PATH).validate() is True
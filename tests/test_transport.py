@@ -0,0 +1,23 @@
+import asyncio
+
+from stub_server import StubServer
+
+from moodify.async_transport import PooledAsyncMiraClient
+
+
+def test_async_execute_without_version():
+    stub = StubServer(body={"result": "ok"}).start()
+
+    async def scenario():
+        async with PooledAsyncMiraClient(config={"API_KEY": "test"}) as client:
+            client.console.base_url = stub.url
+            return [
+                await client.flow.execute("@me/playlist", {"mood": "Happy"}),
+                await client.flow.execute("@me/playlist/1.0.0", {"mood": "Happy"}),
+            ]
+
+    try:
+        assert asyncio.run(scenario()) == [{"result": "ok"}, {"result": "ok"}]
+    finally:
+        stub.stop()
+    assert stub.paths == ["/v1/flows/flows/me/playlist", "/v1/flows/flows/me/playlist?version=1.0.0"]
@@ -0,0 +1,81 @@
+import asyncio
+import subprocess
+import sys
+from email.parser import BytesParser
+
+import pytest
+from stub_server import StubServer
+
+from conftest import ROOT
+from moodify.async_transport import PooledAsyncMiraClient
+from moodify.transport import PooledConsole
+from moodify.upload import KnowledgeUploader, MultipartBody, part_checksums
+
+
+def test_multipart_body_streams_file(tmp_path):
+    path = tmp_path / "catalog.csv"
+    path.write_bytes(b"id,title\n" * 50_000)
+    body = MultipartBody(str(path), {"author_name": "me", "name": "moods"}, chunk_size=4096, part_size=65536)
+    raw = b"".join(bytes(chunk) for chunk in body)
+    assert len(raw) == len(body)
+    message = BytesParser().parsebytes(f"Content-Type: {body.content_type}\r\n\r\n".encode() + raw)
+    fields = {part.get_param("name", header="content-disposition"): part.get_payload(decode=True)
+              for part in message.get_payload()}
+    assert fields == {"author_name": b"me", "name": b"moods", "file": path.read_bytes()}
+    assert len(body.part_checksums) == len(body.parts)
+
+
+def test_uploader_skips_completed_files(tmp_path):
+    path = tmp_path / "catalog.csv"
+    path.write_bytes(b"id,title\n" * 1000)
+    stub = StubServer(body={"message": "ok"}).start()
+    console = PooledConsole("test")
+    console.base_url = stub.url
+    try:
+        with KnowledgeUploader(console, state_dir=str(tmp_path / "state")) as uploader:
+            assert uploader.upload("@me/moods", str(path)) == {"message": "ok"}
+            assert uploader.upload("@me/moods", str(path)) == {"message": "ok"}
+    finally:
+        console.close()
+        stub.stop()
+    assert stub.requests == 1
+
+
+def test_transport_does_not_import_upload_engine():
+    code = "import sys, moodify.transport; print('moodify.upload' in sys.modules)"
+    output = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert output.stdout.strip() == "False"
+
+
+def test_multipart_body_accepts_unaligned_parts(tmp_path):
+    path = tmp_path / "catalog.csv"
+    path.write_bytes(b"id,title\n" * 1000)
+    body = MultipartBody(str(path), {}, chunk_size=512, part_size=1000)
+    b"".join(bytes(chunk) for chunk in body)
+    assert len(body.part_checksums) == 9
+    with pytest.raises(ValueError):
+        part_checksums(str(path), part_size=1000)
+
+
+def test_async_client_uploads_knowledge(tmp_path):
+    paths = []
+    for name in ("a.csv", "b.csv", "c.txt"):
+        path = tmp_path / name
+        path.write_bytes(name.encode() * 1000)
+        paths.append(str(path))
+    stub = StubServer(body={"message": "ok"}).start()
+
+    async def scenario():
+        async with PooledAsyncMiraClient(config={"API_KEY": "test"}) as client:
+            client.console.base_url = stub.url
+            first = await client.knowledge.add("@me/moods", paths[0])
+            batch = [item async for item in client.knowledge.add_many("@me/moods", paths)]
+            return first, batch
+
+    try:
+        first, batch = asyncio.run(scenario())
+    finally:
+        stub.stop()
+    assert first == {"message": "ok"}
+    assert sorted(item.index for item in batch if item.ok) == [0, 1, 2]
+    assert stub.bytes_received > 3000